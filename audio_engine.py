@@ -0,0 +1,490 @@
+import collections
+import threading
+import numpy as np
+from scipy.signal import butter, lfilter
+from limiter import MasterBus, SoftClipLUT
+
+# Parameters shared by every track type and their defaults
+COMMON_TRACK_DEFAULTS = {
+    "enabled": True,
+    "volume": 1.0,
+    "pan": "Center",
+    "pan_direction": "alternate",
+    "pan_speed": 0.5,
+    "pan_depth": 0.5,
+}
+
+# Type-specific parameters and their defaults
+TRACK_DEFAULTS = {
+    "binaural": {
+        "base_freq": 200.0,
+        "beat_freq": 7.83,
+    },
+    "noise": {
+        "noise_type": "white",
+        "low_cut": 20.0,
+        "high_cut": 20000.0,
+    },
+    "tone": {
+        "frequency": 432.0,
+        "iso_enabled": False,
+        "iso_freq": 7.83,
+        "iso_depth": 1.0,
+        "mod_enabled": False,
+        "min_freq": 20.0,
+        "max_freq": 1000.0,
+        "mod_speed": 0.5,
+    },
+}
+
+# Soft clipper for noise tracks
+NOISE_CLIPPER = SoftClipLUT()
+
+# Default length of the crossfade between presets
+CROSSFADE_SECONDS = 3.0
+
+
+class TrackValue:
+    """Plain value holder used for a track's engine state.
+
+    Mirrors the get/set interface of the Tk variables so the audio code
+    works the same whether or not the track's editor is currently built.
+    """
+    
+    def __init__(self, value):
+        self._value = value
+    
+    def get(self):
+        return self._value
+    
+    def set(self, value):
+        self._value = value
+
+
+def track_param_defaults(track_type):
+    """Return the parameter names and defaults for a track type"""
+    defaults = dict(COMMON_TRACK_DEFAULTS)
+    defaults.update(TRACK_DEFAULTS.get(track_type, {}))
+    return defaults
+
+
+def create_track_state(track_id, track_type, settings=None):
+    """Build the engine state for a track without creating any widgets"""
+    settings = settings or {}
+    track_data = {
+        "id": track_id,
+        "type": track_type,
+        "title": TrackValue(settings.get("title", f"{track_type.title()} {track_id+1}"))
+    }
+    
+    for key, default in track_param_defaults(track_type).items():
+        track_data[key] = TrackValue(settings.get(key, default))
+    
+    return track_data
+
+
+class SessionEngine:
+    """Synthesis state for one session: its tracks, volume and play position"""
+    
+    def __init__(self, sample_rate=44100, volume=0.5, duration=180):
+        self.sample_rate = sample_rate
+        self.volume = volume
+        self.duration = duration
+        self.tracks = []
+        self.lock = threading.Lock()
+        self.seed = None  # Fixed seed makes noise repeat identically on reset
+        self.meter = None  # Optional MeterTaps fed with each track's output
+        self.reset()
+    
+    @classmethod
+    def from_settings(cls, settings, sample_rate=44100):
+        """Create an engine from exported session settings"""
+        engine = cls(sample_rate, settings["volume"], settings["duration"])
+        engine.tracks = [create_track_state(track_data.get("id", i), track_data["type"], track_data)
+                         for i, track_data in enumerate(settings["tracks"])]
+        return engine
+    
+    def to_settings(self):
+        """Snapshot the session in the exported settings format"""
+        settings = {
+            "volume": self.volume,
+            "duration": self.duration,
+            "tracks": []
+        }
+        
+        with self.lock:
+            for track in self.tracks:
+                track_data = {
+                    "type": track["type"],
+                    "title": track["title"].get()
+                }
+                for key in track_param_defaults(track["type"]):
+                    track_data[key] = track[key].get()
+                settings["tracks"].append(track_data)
+        
+        return settings
+    
+    def copy(self):
+        """Independent engine with the same session, for offline rendering"""
+        return SessionEngine.from_settings(self.to_settings(), self.sample_rate)
+    
+    def reset(self):
+        """Rewind to the start of the session"""
+        self.current_sample = 0
+        self.rng = np.random.default_rng(self.seed)
+        self.phase_accumulator = {}
+        
+        # Reset filter states
+        self.pink_filter_state = None
+        self.brown_filter_state = None
+    
+    def render(self, frames):
+        """Render the next block at the current position, with volume applied"""
+        t = np.arange(self.current_sample, self.current_sample + frames) / self.sample_rate
+        data = self.generate_audio(t) * self.volume
+        self.current_sample += frames
+        return data
+    
+    def generate_audio(self, t):
+        """Generate audio for all active tracks"""
+        with self.lock:
+            if not self.tracks:
+                return np.zeros((len(t), 2))
+            
+            # Initialize output buffer
+            output = np.zeros((len(t), 2))
+            
+            # Generate each track
+            for track in self.tracks:
+                if not track['enabled'].get():
+                    continue
+                    
+                track_type = track['type']
+                track_volume = track['volume'].get()
+                
+                if track_type == 'binaural':
+                    track_data = self.generate_binaural(t, track)
+                elif track_type == 'noise':
+                    track_data = self.generate_noise(len(t), track)
+                elif track_type == 'tone':
+                    track_data = self.generate_tone(t, track)
+                else:
+                    continue
+                
+                # Apply panning
+                track_data = self.apply_panning(track_data, t, track)
+                
+                # Apply track volume and add to mix
+                scaled = track_data * track_volume
+                if self.meter is not None:
+                    self.meter.push_track(track['id'], scaled)
+                output += scaled
+            
+            return output
+    
+    def generate_binaural(self, t, track):
+        base_freq = track["base_freq"].get()
+        beat_freq = track["beat_freq"].get()
+        
+        # Simple sine wave generation
+        left_freq = base_freq - beat_freq/2
+        right_freq = base_freq + beat_freq/2
+        
+        left_channel = np.sin(2 * np.pi * left_freq * t) * 0.5
+        right_channel = np.sin(2 * np.pi * right_freq * t) * 0.5
+        
+        return np.column_stack((left_channel, right_channel))
+    
+    def generate_noise(self, num_samples, track):
+        noise_type = track["noise_type"].get()
+        
+        if noise_type == "white":
+            # White noise with reduced amplitude
+            noise = self.rng.normal(0, 0.2, num_samples)
+        elif noise_type == "pink":
+            # Generate white noise first
+            white_noise = self.rng.normal(0, 0.2, num_samples)
+            # Apply pink filter
+            noise = self.apply_pink_filter(white_noise)
+        elif noise_type == "brown":
+            # Generate white noise first
+            white_noise = self.rng.normal(0, 0.2, num_samples)
+            # Apply brown filter
+            noise = self.apply_brown_filter(white_noise)
+        else:
+            noise = self.rng.normal(0, 0.2, num_samples)
+        
+        # Apply bandpass filtering if enabled
+        low_cut = track["low_cut"].get()
+        high_cut = track["high_cut"].get()
+        if low_cut > 20 or high_cut < 20000:  # Only apply if not full range
+            noise = self.apply_bandpass_filter(noise, low_cut, high_cut)
+        
+        # Catch rare noise peaks; transparent below the clipper's knee
+        noise = NOISE_CLIPPER(noise, in_place=True)
+        
+        return np.column_stack((noise, noise))
+    
+    def generate_tone(self, t, track):
+        frequency = track["frequency"].get()
+        
+        # Simple sine wave generation
+        tone = np.sin(2 * np.pi * frequency * t) * 0.5
+        
+        return np.column_stack((tone, tone))
+    
+    def apply_panning(self, stereo_data, t, track):
+        """Apply panning to stereo audio data"""
+        pan = track['pan'].get()
+        
+        if pan == "Left":
+            # Left channel only
+            stereo_data[:, 1] = 0
+        elif pan == "Right":
+            # Right channel only
+            stereo_data[:, 0] = 0
+        elif pan == "Center":
+            # Both channels equal
+            pass
+        elif pan == "L-R":
+            # Left to right sweep
+            pan_speed = track['pan_speed'].get()
+            pan_depth = track['pan_depth'].get()
+            sweep = np.sin(2 * np.pi * pan_speed * t)  # Sweep at specified speed
+            stereo_data[:, 0] *= (1 + sweep * pan_depth) / 2
+            stereo_data[:, 1] *= (1 - sweep * pan_depth) / 2
+        elif pan == "R-L":
+            # Right to left sweep
+            pan_speed = track['pan_speed'].get()
+            pan_depth = track['pan_depth'].get()
+            sweep = np.sin(2 * np.pi * pan_speed * t)  # Sweep at specified speed
+            stereo_data[:, 0] *= (1 - sweep * pan_depth) / 2
+            stereo_data[:, 1] *= (1 + sweep * pan_depth) / 2
+        
+        return stereo_data
+    
+    def apply_pink_filter(self, white_noise):
+        """Apply a simple 1/f filter to approximate pink noise"""
+        # Use a simple moving average filter for stability
+        window_size = 10
+        kernel = np.ones(window_size) / window_size
+        filtered = np.convolve(white_noise, kernel, mode='same')
+        # Apply gain compensation
+        return filtered * 0.4
+    
+    def apply_brown_filter(self, white_noise):
+        """Apply a simple 1/f^2 filter to approximate brown noise"""
+        # Use a larger moving average filter for more low-frequency emphasis
+        window_size = 20
+        kernel = np.ones(window_size) / window_size
+        filtered = np.convolve(white_noise, kernel, mode='same')
+        # Apply gain compensation
+        return filtered * 0.25
+    
+    def apply_bandpass_filter(self, signal, low_cut, high_cut):
+        """Apply a bandpass filter to the signal"""
+        nyquist = self.sample_rate / 2
+        low = low_cut / nyquist
+        high = high_cut / nyquist
+        b, a = butter(4, [low, high], btype='band')
+        return lfilter(b, a, signal)
+    
+    def apply_anti_aliasing(self, data):
+        """Apply a simple anti-aliasing filter"""
+        # Simple 2-pole lowpass filter
+        alpha = 0.1  # Filter coefficient
+        filtered = np.zeros_like(data)
+        filtered[0] = data[0]
+        for i in range(1, len(data)):
+            filtered[i] = alpha * data[i] + (1 - alpha) * filtered[i-1]
+        return filtered
+
+
+class PendingPreset:
+    """A queued preset whose engine is warmed up ahead of the switch"""
+    
+    def __init__(self, engine, settings):
+        self.engine = engine
+        self.settings = settings
+        self.buffer = None
+        self.position = 0
+        self.ready = threading.Event()
+    
+    def warm_up(self, num_samples, block_size):
+        """Render the first samples of the preset in the background"""
+        blocks = []
+        for start in range(0, num_samples, block_size):
+            blocks.append(self.engine.render(min(block_size, num_samples - start)))
+        self.buffer = np.concatenate(blocks) if blocks else np.zeros((0, 2))
+        self.ready.set()
+    
+    def read(self, frames):
+        """Return pre-rendered samples first, then continue rendering live"""
+        output = np.empty((frames, 2))
+        available = min(frames, len(self.buffer) - self.position)
+        output[:available] = self.buffer[self.position:self.position + available]
+        self.position += available
+        if available < frames:
+            output[available:] = self.engine.render(frames - available)
+        return output
+
+
+class PresetPlayer:
+    """Plays a session engine and crossfades to queued presets in-stream.
+
+    The switch is an equal-power crossfade computed per sample inside the
+    audio callback, so the output stream never has to be restarted.
+    """
+    
+    def __init__(self, engine, block_size=1024, crossfade_seconds=CROSSFADE_SECONDS):
+        self.engine = engine
+        self.block_size = block_size
+        self.crossfade_seconds = crossfade_seconds
+        self.queue = collections.deque()
+        self.auto_advance = True
+        self.switch_requested = False
+        self.fade_from = None
+        self.fade_to = None
+        self.fade_position = 0
+        self.fade_length = 0
+        self.master = MasterBus(engine.sample_rate)
+    
+    def start(self, engine):
+        """Start playing an engine from the beginning, dropping any crossfade"""
+        engine.reset()
+        self.engine = engine
+        self.master = MasterBus(engine.sample_rate, mode=self.master.mode)
+        self.fade_from = None
+        self.fade_to = None
+        self.switch_requested = False
+    
+    def stop(self):
+        pass
+    
+    def set_master_mode(self, mode):
+        self.master.set_mode(mode)
+    
+    def poll(self):
+        """Nothing to collect; switches are visible directly in `engine`"""
+        pass
+    
+    def update_parameter(self, track_id, key, value):
+        """Engine state is shared in-process, so edits need no forwarding"""
+        pass
+    
+    def update_tracks(self):
+        pass
+    
+    def queued_settings(self):
+        return [pending.settings for pending in self.queue]
+    
+    def crossfade_samples(self):
+        return max(1, int(self.crossfade_seconds * self.engine.sample_rate))
+    
+    def enqueue(self, settings):
+        """Queue a preset and start pre-rendering its side of the crossfade"""
+        engine = SessionEngine.from_settings(settings, self.engine.sample_rate)
+        pending = PendingPreset(engine, settings)
+        self.queue.append(pending)
+        
+        # Exactly the fade length, so the buffer is used up when the engine takes over
+        threading.Thread(target=pending.warm_up, args=(self.crossfade_samples(), self.block_size),
+                         daemon=True).start()
+        return pending
+    
+    def clear_queue(self):
+        self.queue.clear()
+        self.switch_requested = False
+    
+    def request_switch(self):
+        """Crossfade to the next queued preset as soon as it is warmed up"""
+        if self.queue:
+            self.switch_requested = True
+    
+    def switch_now(self):
+        """Switch to the next queued preset immediately, without a crossfade"""
+        if not self.queue:
+            return None
+        pending = self.queue.popleft()
+        # The warm-up thread may still be rendering into this engine
+        pending.ready.wait()
+        pending.engine.reset()
+        self.engine = pending.engine
+        self.switch_requested = False
+        return self.engine
+    
+    def samples_until_switch(self, frames):
+        """Offset within the next `frames` samples where a crossfade starts"""
+        # The GUI thread may clear the queue at any time
+        try:
+            pending = self.queue[0]
+        except IndexError:
+            return None
+        if not pending.ready.is_set():
+            return None
+        if self.switch_requested:
+            return 0
+        if self.auto_advance and self.engine.duration:
+            fade_start = max(0, int(self.engine.duration * self.engine.sample_rate)
+                             - self.crossfade_samples())
+            offset = fade_start - self.engine.current_sample
+            if offset < frames:
+                return max(0, offset)
+        return None
+    
+    def begin_crossfade(self):
+        """Start fading to the next preset; False if the queue changed meanwhile"""
+        try:
+            pending = self.queue.popleft()
+        except IndexError:
+            self.switch_requested = False
+            return False
+        if not pending.ready.is_set():
+            # Cleared and refilled since the check; wait for this one to warm up
+            self.queue.appendleft(pending)
+            return False
+        self.fade_from = self.engine
+        self.fade_to = pending
+        self.fade_position = 0
+        self.fade_length = self.crossfade_samples()
+        self.switch_requested = False
+        return True
+    
+    def render(self, frames):
+        """Render the next block, crossfading between presets when due"""
+        output = np.empty((frames, 2))
+        position = 0
+        
+        while position < frames:
+            remaining = frames - position
+            
+            if self.fade_to is None:
+                offset = self.samples_until_switch(remaining)
+                if offset is None:
+                    output[position:] = self.engine.render(remaining)
+                    break
+                if offset > 0:
+                    output[position:position + offset] = self.engine.render(offset)
+                    position += offset
+                    continue
+                if not self.begin_crossfade():
+                    output[position:] = self.engine.render(remaining)
+                    break
+            
+            # Equal-power gains for this part of the fade
+            count = min(remaining, self.fade_length - self.fade_position)
+            angle = (self.fade_position + np.arange(count) + 0.5) / self.fade_length * (np.pi / 2)
+            outgoing = self.fade_from.render(count)
+            incoming = self.fade_to.read(count)
+            output[position:position + count] = (outgoing * np.cos(angle)[:, None]
+                                                 + incoming * np.sin(angle)[:, None])
+            position += count
+            self.fade_position += count
+            
+            if self.fade_position >= self.fade_length:
+                self.engine = self.fade_to.engine
+                self.fade_from = None
+                self.fade_to = None
+        
+        # Protect the master mix
+        return self.master.process(output)
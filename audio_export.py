@@ -0,0 +1,241 @@
+import queue
+import random
+import threading
+from math import gcd
+import numpy as np
+import soundfile as sf
+from scipy.signal import firwin, upfirdn
+from limiter import MasterBus
+from loudness import LoudnessMeter
+
+# Samples rendered per export chunk (1 second at 44.1 kHz)
+EXPORT_CHUNK_SIZE = 44100
+
+# Loudness normalization defaults
+DEFAULT_TARGET_LUFS = -16.0
+TRUE_PEAK_CEILING_DB = -1.0
+
+# Filter taps per polyphase branch of the streaming resampler
+RESAMPLER_TAPS_PER_PHASE = 32
+
+# Rendered chunks buffered per encoder before the render waits
+ENCODER_QUEUE_SIZE = 8
+
+# Standard delivery formats written by a fan-out export
+DELIVERY_PROFILES = [
+    {"extension": ".wav", "sample_rate": 48000, "format": "WAV", "subtype": "PCM_24"},
+    {"extension": ".flac", "sample_rate": 44100, "format": "FLAC", "subtype": "PCM_16"},
+    {"extension": ".ogg", "sample_rate": 44100, "format": "OGG", "subtype": "VORBIS",
+     "compression_level": 0.7},
+]
+
+
+class ExportTarget:
+    """One output file of an export: its path, format and sample rate"""
+
+    def __init__(self, file_path, sample_rate=None, format=None, subtype=None,
+                 compression_level=None):
+        self.file_path = file_path
+        self.sample_rate = sample_rate
+        self.format = format
+        self.subtype = subtype
+        self.compression_level = compression_level
+
+    @classmethod
+    def from_profile(cls, base_path, profile):
+        options = dict(profile)
+        return cls(base_path + options.pop("extension"), **options)
+
+    def open(self, sample_rate, channels=2):
+        options = {}
+        if self.compression_level is not None:
+            options["compression_level"] = self.compression_level
+        return sf.SoundFile(self.file_path, mode='w', samplerate=sample_rate, channels=channels,
+                            format=self.format, subtype=self.subtype, **options)
+
+
+class StreamingResampler:
+    """Polyphase FIR sample-rate converter that works chunk by chunk.
+
+    Keeps the last input samples between chunks so the output is the same
+    as converting the whole signal at once. Call `flush` after the last
+    chunk to drain the filter.
+    """
+
+    def __init__(self, source_rate, target_rate, channels=2, taps_per_phase=RESAMPLER_TAPS_PER_PHASE):
+        divisor = gcd(int(source_rate), int(target_rate))
+        self.up = int(target_rate) // divisor
+        self.down = int(source_rate) // divisor
+        self.channels = channels
+        # Downsampling needs proportionally longer branches for the same cutoff
+        self.taps = taps_per_phase * max(1, -(-self.down // self.up))
+
+        # Odd-length linear-phase low pass at the lower Nyquist frequency,
+        # padded with a zero so it splits evenly into polyphase branches
+        length = self.taps * self.up
+        cutoff = 0.95 / max(self.up, self.down)
+        self.kernel = np.append(firwin(length - 1, cutoff, window=('kaiser', 8.0)) * self.up, 0.0)
+        self.center = (length - 2) // 2
+
+        self.history = np.zeros((self.taps - 1, channels))
+        self.input_count = 0
+        self.output_count = 0
+
+    def process(self, chunk, final=False):
+        """Convert a chunk, returning every output sample it completes"""
+        buffer = np.concatenate((self.history, chunk))
+        buffer_start = self.input_count - len(self.history)
+        self.input_count += len(chunk)
+
+        if final:
+            end = -(-self.source_total * self.up // self.down)
+        else:
+            # Outputs whose newest input sample has already arrived
+            end = max(self.output_count,
+                      -(-(self.input_count * self.up - self.center) // self.down))
+
+        # Output n sits at n * down + center on the upsampled grid. upfirdn
+        # only yields every down-th point from the buffer start, so delay the
+        # kernel until the first wanted output falls on that grid.
+        first = self.output_count * self.down + self.center - buffer_start * self.up
+        shift = -first % self.down
+        kernel = np.concatenate((np.zeros(shift), self.kernel))
+        start = (first + shift) // self.down
+        output = upfirdn(kernel, buffer, self.up, self.down, axis=0)[start:start + end - self.output_count]
+
+        self.output_count = end
+        self.history = buffer[len(buffer) - (self.taps - 1):]
+        return output
+
+    def flush(self):
+        """Drain the filter with silence after the last input chunk"""
+        self.source_total = self.input_count
+        padding = np.zeros((self.center // self.up + self.taps, self.channels))
+        return self.process(padding, final=True)
+
+
+class EncoderWorker(threading.Thread):
+    """Resamples and encodes rendered chunks for one export target"""
+
+    def __init__(self, target, source_rate, channels=2):
+        super().__init__(daemon=True)
+        self.target = target
+        self.source_rate = source_rate
+        self.channels = channels
+        self.sample_rate = target.sample_rate or source_rate
+        self.chunks = queue.Queue(maxsize=ENCODER_QUEUE_SIZE)
+        self.error = None
+
+    def run(self):
+        resampler = None
+        if self.sample_rate != self.source_rate:
+            resampler = StreamingResampler(self.source_rate, self.sample_rate, self.channels)
+
+        try:
+            with self.target.open(self.sample_rate, self.channels) as f:
+                while True:
+                    chunk = self.chunks.get()
+                    if chunk is None:
+                        break
+                    if resampler is not None:
+                        chunk = resampler.process(chunk)
+                    f.write(chunk)
+                if resampler is not None:
+                    f.write(resampler.flush())
+        except Exception as e:
+            self.error = e
+            # Keep draining so the render never blocks on a failed encoder
+            while self.chunks.get() is not None:
+                pass
+
+
+def render_chunks(engine, total_samples, chunk_size=EXPORT_CHUNK_SIZE, master_mode="limiter"):
+    """Yield (chunk_end, chunk) for the session from its start, through the master bus"""
+    engine.reset()
+    master = MasterBus(engine.sample_rate, mode=master_mode)
+
+    # Drop the limiter's lookahead delay so the output lines up with the input
+    skip = master.latency
+    for i in range(0, total_samples, chunk_size):
+        chunk_end = min(i + chunk_size, total_samples)
+        t = np.arange(i, chunk_end) / engine.sample_rate
+
+        chunk = master.process(engine.generate_audio(t))
+        if skip:
+            dropped = min(skip, len(chunk))
+            chunk = chunk[dropped:]
+            skip -= dropped
+        yield chunk_end, chunk
+
+    tail = master.flush()
+    yield total_samples, tail[skip:]
+
+
+def measure_session(engine, total_samples, progress=None, master_mode="limiter"):
+    """Measure-only pass: run the render through a loudness meter, keep nothing"""
+    meter = LoudnessMeter(engine.sample_rate)
+    for chunk_end, chunk in render_chunks(engine, total_samples, master_mode=master_mode):
+        meter.process(chunk)
+        if progress:
+            progress(chunk_end, total_samples)
+    return meter
+
+
+def export_gain(meter, target_lufs=None):
+    """Gain for the render pass.
+
+    With a target the audio is normalized to that loudness under the
+    true-peak ceiling; otherwise it is only scaled down if it would clip.
+    """
+    if target_lufs is not None:
+        return meter.gain_for_target(target_lufs, TRUE_PEAK_CEILING_DB)
+    if meter.sample_peak > 1.0:
+        return 1.0 / meter.sample_peak
+    return 1.0
+
+
+def export_session(engine, targets, total_samples, target_lufs=None, progress=None,
+                   master_mode="limiter"):
+    """Two-pass streaming export of a session to one or more sound files.
+
+    The first pass only measures loudness and peaks. The second renders
+    once more with the resulting gain and hands every chunk to one encoder
+    thread per target, which converts the sample rate and writes the file,
+    so the session is synthesized once however many formats are written.
+    Memory use does not grow with the duration. Returns the meter and the
+    gain used.
+    """
+    # Render from a private copy with repeatable noise so both passes match
+    engine = engine.copy()
+    engine.seed = random.getrandbits(32)
+
+    def measure_progress(current, total):
+        if progress:
+            progress(current, 2 * total, "Measuring loudness...")
+
+    meter = measure_session(engine, total_samples, measure_progress, master_mode)
+    gain = export_gain(meter, target_lufs)
+
+    workers = [EncoderWorker(target, engine.sample_rate) for target in targets]
+    for worker in workers:
+        worker.start()
+
+    try:
+        for chunk_end, chunk in render_chunks(engine, total_samples, master_mode=master_mode):
+            chunk = chunk * gain
+            for worker in workers:
+                worker.chunks.put(chunk)
+            if progress:
+                progress(total_samples + chunk_end, 2 * total_samples, "Rendering audio...")
+    finally:
+        for worker in workers:
+            worker.chunks.put(None)
+
+    if progress:
+        progress(2 * total_samples, 2 * total_samples, "Finishing encoders...")
+    for worker in workers:
+        worker.join()
+        if worker.error is not None:
+            raise worker.error
+
+    return meter, gain
@@ -0,0 +1,308 @@
+import threading
+import time
+from types import SimpleNamespace
+import numpy as np
+import soundfile as sf
+
+# Final stretch before a deadline that the driver spins instead of sleeping
+SPIN_SECONDS = 0.001
+
+
+class CallbackStatus:
+    """Minimal stand-in for sounddevice's CallbackFlags"""
+
+    def __init__(self, output_underflow=False):
+        self.output_underflow = output_underflow
+
+    def __bool__(self):
+        return self.output_underflow
+
+    def __str__(self):
+        return "output underflow" if self.output_underflow else ""
+
+
+class AudioSink:
+    """Base class for audio outputs fed by a sounddevice-style callback.
+
+    The callback has the same signature as for ``sd.OutputStream``:
+    ``callback(outdata, frames, time, status)``.
+    """
+
+    def __init__(self, callback, sample_rate=44100, block_size=1024, channels=2):
+        self.callback = callback
+        self.sample_rate = sample_rate
+        self.block_size = block_size
+        self.channels = channels
+
+    @property
+    def active(self):
+        raise NotImplementedError
+
+    def start(self):
+        raise NotImplementedError
+
+    def stop(self):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class SoundDeviceSink(AudioSink):
+    """Plays through the sound card with a sounddevice output stream"""
+
+    def __init__(self, callback, sample_rate=44100, block_size=1024, channels=2):
+        super().__init__(callback, sample_rate, block_size, channels)
+        self.stream = None
+
+    @property
+    def active(self):
+        return self.stream is not None and self.stream.active
+
+    def start(self):
+        # Imported here so hosts without PortAudio can still use other sinks
+        import sounddevice as sd
+
+        self.stream = sd.OutputStream(
+            channels=self.channels,
+            samplerate=self.sample_rate,
+            blocksize=self.block_size,
+            callback=self.callback,
+            dtype='float32',
+            latency='low',
+            prime_output_buffers_using_stream_callback=True
+        )
+        self.stream.start()
+
+    def stop(self):
+        if self.stream is not None:
+            self.stream.stop()
+
+    def close(self):
+        if self.stream is not None:
+            self.stream.close()
+            self.stream = None
+
+
+class DriverStats:
+    """Timing collected by a ClockDriver, all durations in seconds"""
+
+    def __init__(self, block_period):
+        self.block_period = block_period
+        self.callbacks = 0
+        self.deadline_misses = 0
+        self.callback_times = []
+        self.jitter = []
+
+    def record(self, elapsed, jitter, missed):
+        self.callbacks += 1
+        self.callback_times.append(elapsed)
+        self.jitter.append(jitter)
+        if missed:
+            self.deadline_misses += 1
+
+    def summary(self):
+        times = np.array(self.callback_times) if self.callback_times else np.zeros(1)
+        jitter = np.array(self.jitter) if self.jitter else np.zeros(1)
+        return {
+            "callbacks": self.callbacks,
+            "deadline_misses": self.deadline_misses,
+            "block_period_ms": self.block_period * 1000,
+            "callback_mean_ms": float(times.mean() * 1000),
+            "callback_p99_ms": float(np.percentile(times, 99) * 1000),
+            "callback_max_ms": float(times.max() * 1000),
+            "load_percent": float(times.mean() / self.block_period * 100),
+            "jitter_mean_ms": float(jitter.mean() * 1000),
+            "jitter_max_ms": float(jitter.max() * 1000)
+        }
+
+
+class ClockDriver:
+    """Calls a sink's callback on a precise block schedule and records timing.
+
+    In real-time mode each block is due at ``start + n * block_period``; the
+    driver sleeps until then, so jitter is how late the callback started.
+    A block misses its deadline when it is delivered after the point the
+    next one was due, which is what shows up as an underrun on a sound
+    card; the following callback then sees ``status.output_underflow``.
+
+    With ``realtime=False`` the clock is simulated: blocks run back to back
+    and a miss is a callback that took longer than one block period.
+    """
+
+    def __init__(self, sink, realtime=True, max_blocks=None):
+        self.sink = sink
+        self.realtime = realtime
+        self.max_blocks = max_blocks
+        self.block_period = sink.block_size / sink.sample_rate
+        self.stats = DriverStats(self.block_period)
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join()
+        self.thread = None
+
+    def wait_until(self, deadline):
+        remaining = deadline - time.perf_counter()
+        if remaining > SPIN_SECONDS:
+            time.sleep(remaining - SPIN_SECONDS)
+        while time.perf_counter() < deadline:
+            pass
+
+    def run(self):
+        sink = self.sink
+        outdata = np.zeros((sink.block_size, sink.channels), dtype='float32')
+        start = time.perf_counter()
+        underflow = False
+        block = 0
+
+        while self.running and (self.max_blocks is None or block < self.max_blocks):
+            scheduled = block * self.block_period
+            if self.realtime:
+                self.wait_until(start + scheduled)
+
+            began = time.perf_counter()
+            time_info = SimpleNamespace(currentTime=began - start,
+                                        outputBufferDacTime=scheduled + self.block_period)
+            sink.callback(outdata, sink.block_size, time_info, CallbackStatus(underflow))
+            finished = time.perf_counter()
+
+            elapsed = finished - began
+            if self.realtime:
+                jitter = began - (start + scheduled)
+                underflow = finished - start > scheduled + self.block_period
+            else:
+                jitter = 0.0
+                underflow = elapsed > self.block_period
+            self.stats.record(elapsed, jitter, underflow)
+
+            sink.write(outdata)
+            block += 1
+
+        self.running = False
+
+
+class DrivenSink(AudioSink):
+    """A sink without a device clock, driven by a ClockDriver thread"""
+
+    def __init__(self, callback, sample_rate=44100, block_size=1024, channels=2,
+                 realtime=True, max_blocks=None):
+        super().__init__(callback, sample_rate, block_size, channels)
+        self.driver = ClockDriver(self, realtime, max_blocks)
+
+    @property
+    def active(self):
+        return self.driver.running
+
+    @property
+    def stats(self):
+        return self.driver.stats
+
+    def start(self):
+        self.driver.start()
+
+    def stop(self):
+        self.driver.stop()
+
+    def run(self):
+        """Drive the callback on the calling thread until max_blocks is reached"""
+        self.driver.running = True
+        self.driver.run()
+
+    def write(self, block):
+        """Consume a block produced by the callback"""
+        raise NotImplementedError
+
+
+class NullSink(DrivenSink):
+    """Discards the audio; useful for profiling the render path"""
+
+    def write(self, block):
+        pass
+
+
+class FileSink(DrivenSink):
+    """Writes the audio to a sound file as it is produced"""
+
+    def __init__(self, callback, file_path, sample_rate=44100, block_size=1024, channels=2,
+                 realtime=False, max_blocks=None):
+        super().__init__(callback, sample_rate, block_size, channels, realtime, max_blocks)
+        self.file_path = file_path
+        self.file = None
+
+    def start(self):
+        self.open()
+        super().start()
+
+    def run(self):
+        self.open()
+        super().run()
+
+    def open(self):
+        if self.file is None:
+            self.file = sf.SoundFile(self.file_path, mode='w', samplerate=self.sample_rate,
+                                     channels=self.channels)
+
+    def write(self, block):
+        self.file.write(block)
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+class RingSink(DrivenSink):
+    """Keeps the most recent audio in an in-memory ring buffer"""
+
+    def __init__(self, callback, capacity_seconds=10, sample_rate=44100, block_size=1024,
+                 channels=2, realtime=True, max_blocks=None):
+        super().__init__(callback, sample_rate, block_size, channels, realtime, max_blocks)
+        self.buffer = np.zeros((int(capacity_seconds * sample_rate), channels), dtype='float32')
+        self.write_index = 0
+        self.total_written = 0
+        self.lock = threading.Lock()
+
+    def write(self, block):
+        capacity = len(self.buffer)
+        frames = min(len(block), capacity)
+        block = block[-frames:]
+        with self.lock:
+            first = min(frames, capacity - self.write_index)
+            self.buffer[self.write_index:self.write_index + first] = block[:first]
+            self.buffer[:frames - first] = block[first:]
+            self.write_index = (self.write_index + frames) % capacity
+            self.total_written += frames
+
+    def read_latest(self, frames):
+        """Return the most recent frames, oldest first"""
+        with self.lock:
+            frames = min(frames, self.total_written, len(self.buffer))
+            indices = (self.write_index - frames + np.arange(frames)) % len(self.buffer)
+            return self.buffer[indices]
+
+
+# Sinks selectable by name
+SINK_TYPES = {
+    "sounddevice": SoundDeviceSink,
+    "null": NullSink,
+    "file": FileSink,
+    "ring": RingSink,
+}
+
+
+def create_sink(kind, callback, **kwargs):
+    """Create a sink by name, passing any sink-specific options through"""
+    try:
+        sink_class = SINK_TYPES[kind]
+    except KeyError:
+        raise ValueError(f"Unknown audio sink: {kind}")
+    return sink_class(callback, **kwargs)
@@ -0,0 +1,69 @@
+"""Compare the cost of master bus protection per audio block.
+
+Times the original tanh soft clip against the LUT soft clipper and the
+lookahead limiter on blocks of pink-ish noise and on a loud tone.
+
+Example:
+    python benchmark_master.py --blocks 2000 --block-size 1024
+"""
+import argparse
+import time
+import numpy as np
+from limiter import LookaheadLimiter, SoftClipLUT
+
+
+def tanh_soft_clip(data, threshold=0.8):
+    """The tanh clipping previously applied to noise tracks and exports"""
+    return np.tanh(data * threshold) / threshold
+
+
+def time_per_block(process, blocks):
+    start = time.perf_counter()
+    for block in blocks:
+        process(block)
+    return (time.perf_counter() - start) / len(blocks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark master bus processing")
+    parser.add_argument("--blocks", type=int, default=2000)
+    parser.add_argument("--block-size", type=int, default=1024)
+    parser.add_argument("--sample-rate", type=int, default=44100)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    frames = args.blocks * args.block_size
+    t = np.arange(frames) / args.sample_rate
+    signals = {
+        "noise": np.repeat(rng.normal(0, 0.2, (frames, 1)), 2, axis=1),
+        "loud tone": np.column_stack((np.sin(2 * np.pi * 200 * t),) * 2) * 1.5
+    }
+
+    clipper = SoftClipLUT()
+    block_period = args.block_size / args.sample_rate
+    print(f"block: {args.block_size} samples, {block_period * 1000:.2f} ms")
+
+    for name, signal in signals.items():
+        blocks = np.split(signal, args.blocks)
+        limiter = LookaheadLimiter(args.sample_rate)
+        results = {
+            "tanh soft clip": time_per_block(tanh_soft_clip, blocks),
+            "LUT soft clip": time_per_block(clipper, blocks),
+            "lookahead limiter": time_per_block(limiter.process, blocks)
+        }
+
+        print(f"\n{name}:")
+        for label, seconds in results.items():
+            print(f"  {label:18s} {seconds * 1e6:8.1f} us/block"
+                  f"  ({seconds / block_period * 100:.2f}% of real time)")
+
+        # Samples below the knee should pass through untouched, block by block
+        below = np.abs(signal) <= clipper.knee
+        for label, process in (("tanh soft clip", tanh_soft_clip), ("LUT soft clip", clipper)):
+            processed = np.concatenate([process(block) for block in blocks])
+            changed = np.count_nonzero(processed[below] != signal[below])
+            print(f"  {label:18s} below-knee samples changed: {changed / below.sum() * 100:.1f}%")
+
+
+if __name__ == "__main__":
+    main()
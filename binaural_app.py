@@ -1,14 +1,26 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import numpy as np
-import sounddevice as sd
-import soundfile as sf
 import threading
 import time
-from scipy.signal import butter, lfilter
 import os
 import json
 import queue
+from audio_engine import SessionEngine, PresetPlayer, create_track_state
+from audio_export import export_session, ExportTarget, DEFAULT_TARGET_LUFS, DELIVERY_PROFILES
+from audio_sinks import create_sink
+from render_process import RenderProcessPlayer
+from limiter import MASTER_MODES
+from meters import MeterTaps, MeterProcessor, METER_RATE, SPECTRUM_MIN_FREQ
+
+# Number of collapsed track rows created per idle tick during import
+ROW_BATCH_SIZE = 20
+
+# Meter window display ranges
+METER_FLOOR_DB = -60.0
+SPECTRUM_FLOOR_DB = -100.0
+METER_TRACK_LIMIT = 16
+
 
 class BinauralApp:
     def __init__(self, root):
@@ -20,21 +32,24 @@ class BinauralApp:
         # Audio settings
         self.sample_rate = 44100
         self.block_size = 1024
-        self.stream = None
+        self.sink = None
+        self.sink_kind = "sounddevice"
+        self.master_mode = "limiter"
         self.is_playing = False
-        self.tracks = []
         self.track_counter = 0
-        self.volume = 0.5
-        self.duration = 180
-        self.current_sample = 0
-        self.phase_accumulator = {}
-        self.audio_lock = threading.Lock()
+        self.engine = SessionEngine(self.sample_rate)
+        self.player = PresetPlayer(self.engine, self.block_size)
         self.audio_queue = queue.Queue(maxsize=4)
         self.last_buffer = None  # Store last buffer for smooth transitions
         
-        # Initialize filter states
-        self.pink_filter_state = None
-        self.brown_filter_state = None
+        # Metering, active only while the meter window is open
+        self.meter_taps = None
+        self.meter_processor = None
+        self.meter_window = None
+        
+        # Track panel virtualization state
+        self.pending_rows = []
+        self.visible_refresh_pending = False
         
         # Create main container frames
         self.left_panel = ttk.Frame(self.root)
@@ -46,21 +61,46 @@ class BinauralApp:
         
         # Ensure clean shutdown
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
+        
+        # Follow preset switches made by the player inside the stream
+        self.root.after(200, self.poll_player)
+    
+    @property
+    def tracks(self):
+        return self.engine.tracks
+    
+    @property
+    def audio_lock(self):
+        return self.engine.lock
+    
+    @property
+    def volume(self):
+        return self.engine.volume
+    
+    @volume.setter
+    def volume(self, value):
+        self.engine.volume = value
+        self.player.update_parameter(None, "volume", value)
+    
+    @property
+    def duration(self):
+        return self.engine.duration
+    
+    @duration.setter
+    def duration(self, value):
+        self.engine.duration = value
+        self.player.update_parameter(None, "duration", value)
     
     def audio_callback(self, outdata, frames, time, status):
         try:
             if self.is_playing:
-                # Calculate time values for this block
-                t = np.arange(self.current_sample, self.current_sample + frames) / self.sample_rate
+                # Generate audio, crossfading to a queued preset when due
+                data = self.player.render(frames)
                 
-                # Generate audio
-                data = self.generate_audio(t)
-                
-                # Apply volume
-                data *= self.volume
-                
-                # Update sample counter
-                self.current_sample += frames
+                # Hand a copy to the meters; analysis happens elsewhere
+                taps = self.meter_taps
+                if taps is not None:
+                    taps.push_master(data)
                 
                 # Write to output buffer
                 outdata[:] = data
@@ -78,26 +118,15 @@ class BinauralApp:
             
         self.is_playing = True
         self.play_button.config(text="Stop")
-        self.current_sample = 0
-        self.phase_accumulator = {}  # Reset phase accumulator
+        self.select_player()
+        self.player.start(self.engine)  # Reset position, phase and filter states
         self.last_buffer = None  # Reset last buffer
         
-        # Reset filter states
-        self.pink_filter_state = None
-        self.brown_filter_state = None
-        
         try:
-            # Start the audio stream with specific settings
-            self.stream = sd.OutputStream(
-                channels=2,
-                samplerate=self.sample_rate,
-                blocksize=self.block_size,
-                callback=self.audio_callback,
-                dtype='float32',
-                latency='low',
-                prime_output_buffers_using_stream_callback=True
-            )
-            self.stream.start()
+            # Start the selected audio output
+            self.sink = create_sink(self.sink_kind, self.audio_callback,
+                                    sample_rate=self.sample_rate, block_size=self.block_size)
+            self.sink.start()
             
         except Exception as e:
             print(f"Error starting playback: {e}")
@@ -107,13 +136,30 @@ class BinauralApp:
         self.is_playing = False
         self.play_button.config(text="▶ Play")
         
-        if self.stream is not None:
-            self.stream.stop()
-            self.stream.close()
-            self.stream = None
+        if self.sink is not None:
+            self.sink.stop()
+            self.sink.close()
+            self.sink = None
             self.last_buffer = None
+        
+        self.player.stop()
+    
+    def select_player(self):
+        """Switch between in-process and out-of-process rendering, keeping the queue"""
+        player_class = RenderProcessPlayer if self.render_process_var.get() else PresetPlayer
+        if isinstance(self.player, player_class):
+            return
+        
+        queued = self.player.queued_settings()
+        auto_advance = self.player.auto_advance
+        self.player = player_class(self.engine, self.block_size)
+        self.player.auto_advance = auto_advance
+        self.player.set_master_mode(self.master_mode)
+        for settings in queued:
+            self.player.enqueue(settings)
     
     def on_closing(self):
+        self.close_meters()
         self.stop_playback()
         self.root.destroy()
     
@@ -153,6 +199,26 @@ class BinauralApp:
         self.volume_entry.bind('<Return>', self.update_volume_from_entry)
         self.volume_entry.bind('<FocusOut>', self.update_volume_from_entry)
         
+        # Audio output selection, applied on the next Play
+        ttk.Label(playback_frame, text="Output:").pack(side="left", padx=(15, 5))
+        self.sink_var = tk.StringVar(value=self.sink_kind)
+        self.sink_var.trace_add("write", lambda *args: setattr(self, "sink_kind", self.sink_var.get()))
+        ttk.Combobox(playback_frame, textvariable=self.sink_var,
+                     values=["sounddevice", "null", "ring"],
+                     state="readonly", width=12).pack(side="left", padx=5)
+        
+        # Master bus protection
+        ttk.Label(playback_frame, text="Master:").pack(side="left", padx=(15, 5))
+        self.master_var = tk.StringVar(value=self.master_mode)
+        self.master_var.trace_add("write", self.update_master_mode)
+        ttk.Combobox(playback_frame, textvariable=self.master_var, values=MASTER_MODES,
+                     state="readonly", width=8).pack(side="left", padx=5)
+        
+        # Synthesis in a separate process, applied on the next Play
+        self.render_process_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(playback_frame, text="Separate process",
+                        variable=self.render_process_var).pack(side="left", padx=5)
+        
         # Duration control
         duration_frame = ttk.Frame(control_panel)
         duration_frame.pack(fill="x", padx=5, pady=5)
@@ -177,6 +243,36 @@ class BinauralApp:
         self.export_button = ttk.Button(export_frame, text="Export to WAV", command=self.export_wav)
         self.export_button.pack(side="right", padx=5)
         
+        ttk.Button(export_frame, text="Export Deliverables",
+                   command=self.export_deliverables).pack(side="right", padx=5)
+        
+        # Loudness normalization for exports
+        self.normalize_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(export_frame, text="Normalize loudness to",
+                        variable=self.normalize_var).pack(side="left", padx=5)
+        self.target_lufs_var = tk.StringVar(value=str(DEFAULT_TARGET_LUFS))
+        ttk.Entry(export_frame, textvariable=self.target_lufs_var, width=6).pack(side="left")
+        ttk.Label(export_frame, text="LUFS").pack(side="left", padx=5)
+        
+        # Preset queue, switched with a crossfade while playing
+        queue_frame = ttk.Frame(control_panel)
+        queue_frame.pack(fill="x", padx=5, pady=5)
+        
+        ttk.Button(queue_frame, text="Queue Preset", command=self.queue_preset).pack(side="left", padx=5)
+        ttk.Button(queue_frame, text="Next Preset", command=self.next_preset).pack(side="left", padx=5)
+        ttk.Button(queue_frame, text="Clear Queue", command=self.clear_queue).pack(side="left", padx=5)
+        
+        self.auto_advance_var = tk.BooleanVar(value=self.player.auto_advance)
+        self.auto_advance_var.trace_add(
+            "write", lambda *args: setattr(self.player, "auto_advance", self.auto_advance_var.get()))
+        ttk.Checkbutton(queue_frame, text="Auto-advance",
+                        variable=self.auto_advance_var).pack(side="left", padx=5)
+        
+        self.queue_label = ttk.Label(queue_frame, text="Queued: 0")
+        self.queue_label.pack(side="left", padx=5)
+        
+        ttk.Button(queue_frame, text="Meters", command=self.open_meters).pack(side="right", padx=5)
+        
     def create_tracks_panel(self):
         # Tracks panel in left panel
         tracks_panel = ttk.LabelFrame(self.left_panel, text="Tracks")
@@ -207,15 +303,27 @@ class BinauralApp:
         scrollbar = ttk.Scrollbar(tracks_panel, orient="vertical", command=self.tracks_canvas.yview)
         self.tracks_frame = ttk.Frame(self.tracks_canvas)
         
-        self.tracks_frame.bind("<Configure>", 
-                              lambda e: self.tracks_canvas.configure(scrollregion=self.tracks_canvas.bbox("all")))
-        
+        def on_frame_configure(event):
+            self.tracks_canvas.configure(scrollregion=self.tracks_canvas.bbox("all"))
+            self.schedule_visible_refresh()
+
+        def on_scroll(first, last):
+            scrollbar.set(first, last)
+            self.schedule_visible_refresh()
+
+        self.tracks_frame.bind("<Configure>", on_frame_configure)
+        self.tracks_canvas.bind("<Configure>", lambda e: self.schedule_visible_refresh())
+
         self.tracks_canvas.create_window((0, 0), window=self.tracks_frame, anchor="nw")
-        self.tracks_canvas.configure(yscrollcommand=scrollbar.set)
+        self.tracks_canvas.configure(yscrollcommand=on_scroll)
         
         self.tracks_canvas.pack(side="left", fill="both", expand=True, padx=5, pady=5)
         scrollbar.pack(side="right", fill="y")
         
+    def update_master_mode(self, *args):
+        self.master_mode = self.master_var.get()
+        self.player.set_master_mode(self.master_mode)
+    
     def update_volume_from_slider(self, value):
         self.volume = float(value)
         self.volume_entry.delete(0, tk.END)
@@ -293,151 +401,6 @@ class BinauralApp:
         else:
             self.start_playback()
     
-    def soft_clip(self, data, threshold=0.8):
-        """Apply soft clipping to prevent harsh digital clipping"""
-        # Apply tanh-based soft clipping with smoother transition
-        return np.tanh(data * threshold) / threshold
-    
-    def generate_audio(self, t):
-        """Generate audio for all active tracks"""
-        with self.audio_lock:
-            if not self.tracks:
-                return np.zeros((len(t), 2))
-            
-            # Initialize output buffer
-            output = np.zeros((len(t), 2))
-            
-            # Generate each track
-            for track in self.tracks:
-                if not track['enabled'].get():
-                    continue
-                    
-                track_type = track['type']
-                track_volume = track['volume'].get()
-                
-                if track_type == 'binaural':
-                    track_data = self.generate_binaural(t, track)
-                elif track_type == 'noise':
-                    track_data = self.generate_noise(len(t), track)
-                elif track_type == 'tone':
-                    track_data = self.generate_tone(t, track)
-                else:
-                    continue
-                
-                # Apply panning
-                track_data = self.apply_panning(track_data, t, track)
-                
-                # Apply track volume and add to mix
-                output += track_data * track_volume
-            
-            return output
-    
-    def generate_binaural(self, t, track):
-        base_freq = track["base_freq"].get()
-        beat_freq = track["beat_freq"].get()
-        
-        # Simple sine wave generation
-        left_freq = base_freq - beat_freq/2
-        right_freq = base_freq + beat_freq/2
-        
-        left_channel = np.sin(2 * np.pi * left_freq * t) * 0.5
-        right_channel = np.sin(2 * np.pi * right_freq * t) * 0.5
-        
-        return np.column_stack((left_channel, right_channel))
-    
-    def generate_noise(self, num_samples, track):
-        noise_type = track["noise_type"].get()
-        
-        if noise_type == "white":
-            # White noise with reduced amplitude
-            noise = np.random.normal(0, 0.2, num_samples)
-        elif noise_type == "pink":
-            # Generate white noise first
-            white_noise = np.random.normal(0, 0.2, num_samples)
-            # Apply pink filter
-            noise = self.apply_pink_filter(white_noise)
-        elif noise_type == "brown":
-            # Generate white noise first
-            white_noise = np.random.normal(0, 0.2, num_samples)
-            # Apply brown filter
-            noise = self.apply_brown_filter(white_noise)
-        else:
-            noise = np.random.normal(0, 0.2, num_samples)
-        
-        # Apply bandpass filtering if enabled
-        low_cut = track["low_cut"].get()
-        high_cut = track["high_cut"].get()
-        if low_cut > 20 or high_cut < 20000:  # Only apply if not full range
-            noise = self.apply_bandpass_filter(noise, low_cut, high_cut)
-        
-        # Apply soft clipping to prevent any potential clipping
-        noise = self.soft_clip(noise, threshold=0.8)
-        
-        return np.column_stack((noise, noise))
-    
-    def generate_tone(self, t, track):
-        frequency = track["frequency"].get()
-        
-        # Simple sine wave generation
-        tone = np.sin(2 * np.pi * frequency * t) * 0.5
-        
-        return np.column_stack((tone, tone))
-    
-    def apply_panning(self, stereo_data, t, track):
-        """Apply panning to stereo audio data"""
-        pan = track['pan'].get()
-        
-        if pan == "Left":
-            # Left channel only
-            stereo_data[:, 1] = 0
-        elif pan == "Right":
-            # Right channel only
-            stereo_data[:, 0] = 0
-        elif pan == "Center":
-            # Both channels equal
-            pass
-        elif pan == "L-R":
-            # Left to right sweep
-            pan_speed = track['pan_speed'].get()
-            pan_depth = track['pan_depth'].get()
-            sweep = np.sin(2 * np.pi * pan_speed * t)  # Sweep at specified speed
-            stereo_data[:, 0] *= (1 + sweep * pan_depth) / 2
-            stereo_data[:, 1] *= (1 - sweep * pan_depth) / 2
-        elif pan == "R-L":
-            # Right to left sweep
-            pan_speed = track['pan_speed'].get()
-            pan_depth = track['pan_depth'].get()
-            sweep = np.sin(2 * np.pi * pan_speed * t)  # Sweep at specified speed
-            stereo_data[:, 0] *= (1 - sweep * pan_depth) / 2
-            stereo_data[:, 1] *= (1 + sweep * pan_depth) / 2
-        
-        return stereo_data
-    
-    def apply_pink_filter(self, white_noise):
-        """Apply a simple 1/f filter to approximate pink noise"""
-        # Use a simple moving average filter for stability
-        window_size = 10
-        kernel = np.ones(window_size) / window_size
-        filtered = np.convolve(white_noise, kernel, mode='same')
-        # Apply gain compensation
-        return filtered * 0.4
-    
-    def apply_brown_filter(self, white_noise):
-        """Apply a simple 1/f^2 filter to approximate brown noise"""
-        # Use a larger moving average filter for more low-frequency emphasis
-        window_size = 20
-        kernel = np.ones(window_size) / window_size
-        filtered = np.convolve(white_noise, kernel, mode='same')
-        # Apply gain compensation
-        return filtered * 0.25
-    
-    def apply_bandpass_filter(self, signal, low_cut, high_cut):
-        """Apply a bandpass filter to the signal"""
-        nyquist = self.sample_rate / 2
-        low = low_cut / nyquist
-        high = high_cut / nyquist
-        b, a = butter(4, [low, high], btype='band')
-        return lfilter(b, a, signal)
     
     def export_wav(self):
         """Export the current audio to a WAV file"""
@@ -453,11 +416,42 @@ class BinauralApp:
         
         if not file_path:
             return
+        
+        self.run_export([ExportTarget(file_path)])
+    
+    def export_deliverables(self):
+        """Export WAV, FLAC and OGG versions of the session from a single render"""
+        if not self.tracks:
+            messagebox.showinfo("No Tracks", "Please add at least one track first.")
+            return
             
+        # Get base name; each format adds its own extension
+        file_path = filedialog.asksaveasfilename(
+            filetypes=[("All files", "*.*")],
+            title="Export Deliverables"
+        )
+        
+        if not file_path:
+            return
+        
+        base_path = os.path.splitext(file_path)[0]
+        self.run_export([ExportTarget.from_profile(base_path, profile)
+                         for profile in DELIVERY_PROFILES])
+    
+    def run_export(self, targets):
+        """Render the session once and write it to every target in the background"""
         try:
+            # Export the session shown in the editor
+            engine = self.engine
+            
             # Calculate total samples
             total_samples = int(self.duration * self.sample_rate)
             
+            # Loudness target, or None to only prevent clipping
+            target_lufs = None
+            if self.normalize_var.get():
+                target_lufs = float(self.target_lufs_var.get())
+            
             # Create progress window
             progress_window = tk.Toplevel(self.root)
             progress_window.title("Exporting...")
@@ -480,37 +474,16 @@ class BinauralApp:
             
             def do_export():
                 try:
-                    # Generate audio in chunks to prevent memory issues
-                    chunk_size = 44100  # 1 second chunks
-                    audio_data = np.zeros((total_samples, 2))
-                    
-                    for i in range(0, total_samples, chunk_size):
-                        chunk_end = min(i + chunk_size, total_samples)
-                        t = np.arange(i, chunk_end) / self.sample_rate
-                        
-                        # Generate chunk
-                        chunk = self.generate_audio(t)
-                        
-                        # Apply soft clipping to prevent harsh digital clipping
-                        chunk = self.soft_clip(chunk)
-                        
-                        # Store chunk
-                        audio_data[i:chunk_end] = chunk
-                        
-                        # Update progress
-                        update_progress(chunk_end, total_samples)
-                    
-                    # Normalize the final audio
-                    max_val = np.max(np.abs(audio_data))
-                    if max_val > 1.0:
-                        audio_data /= max_val
-                    
-                    # Save to file
-                    update_progress(total_samples, total_samples, "Saving file...")
-                    sf.write(file_path, audio_data, self.sample_rate)
+                    # Measure first, then render once with the computed gain
+                    meter, gain = export_session(engine, targets, total_samples,
+                                                 target_lufs, update_progress, self.master_mode)
                     
                     progress_window.destroy()
-                    messagebox.showinfo("Success", "Audio exported successfully!")
+                    messagebox.showinfo(
+                        "Success",
+                        f"Audio exported successfully to {len(targets)} file(s)!\n"
+                        f"Measured loudness: {meter.integrated_loudness():.1f} LUFS, "
+                        f"applied gain: {20 * np.log10(gain):+.1f} dB")
                     
                 except Exception as e:
                     progress_window.destroy()
@@ -536,53 +509,8 @@ class BinauralApp:
         if not file_path:
             return
             
-        settings = {
-            "volume": self.volume,
-            "duration": self.duration,
-            "tracks": []
-        }
-        
-        for track in self.tracks:
-            track_data = {
-                "type": track["type"],
-                "title": track["title"].get(),
-                "enabled": track["enabled"].get(),
-                "volume": track["volume"].get(),
-                "pan_mode": track["pan_mode"].get()
-            }
-            
-            # Add pan settings if auto-pan is enabled
-            if track["pan_mode"].get() == "auto-pan":
-                track_data.update({
-                    "pan_direction": track["pan_direction"].get(),
-                    "pan_speed": track["pan_speed"].get(),
-                    "pan_depth": track["pan_depth"].get()
-                })
-            
-            if track["type"] == "binaural":
-                track_data.update({
-                    "base_freq": track["base_freq"].get(),
-                    "beat_freq": track["beat_freq"].get()
-                })
-            elif track["type"] == "noise":
-                track_data.update({
-                    "noise_type": track["noise_type"].get(),
-                    "low_cut": track["low_cut"].get(),
-                    "high_cut": track["high_cut"].get()
-                })
-            elif track["type"] == "tone":
-                track_data.update({
-                    "frequency": track["frequency"].get(),
-                    "iso_enabled": track["iso_enabled"].get(),
-                    "iso_freq": track["iso_freq"].get(),
-                    "iso_depth": track["iso_depth"].get(),
-                    "mod_enabled": track["mod_enabled"].get(),
-                    "min_freq": track["min_freq"].get(),
-                    "max_freq": track["max_freq"].get(),
-                    "mod_speed": track["mod_speed"].get()
-                })
-            
-            settings["tracks"].append(track_data)
+        # Engine state holds every parameter, whether or not the editor is built
+        settings = self.engine.to_settings()
         
         try:
             with open(file_path, 'w') as f:
@@ -604,64 +532,393 @@ class BinauralApp:
             with open(file_path, 'r') as f:
                 settings = json.load(f)
             
+            # Build the engine state for every track first; widgets follow lazily
+            new_tracks = [create_track_state(i, track_data["type"], track_data)
+                          for i, track_data in enumerate(settings["tracks"])]
+            
             # Clear existing tracks
-            for track in self.tracks:
-                track["frame"].destroy()
-            self.tracks.clear()
-            self.track_counter = 0
+            self.clear_track_rows()
+            with self.audio_lock:
+                self.engine.tracks = new_tracks
+            self.player.update_tracks()
             
             # Set global settings
             self.volume = settings["volume"]
-            self.volume_slider.set(self.volume)
-            self.volume_entry.delete(0, tk.END)
-            self.volume_entry.insert(0, f"{int(self.volume * 100)}%")
-            
             self.duration = settings["duration"]
-            self.duration_slider.set(min(self.duration, 600))
-            self.duration_var.set(str(self.duration))
             
-            # Create tracks
-            for track_data in settings["tracks"]:
-                self.add_track(track_data["type"], track_data)
+            self.show_engine(self.engine)
                 
             messagebox.showinfo("Import Complete", "Settings imported successfully")
         except Exception as e:
             messagebox.showerror("Import Failed", f"Error: {str(e)}")
 
+    def queue_preset(self):
+        file_path = filedialog.askopenfilename(
+            filetypes=[("JSON files", "*.json"), ("All files", "*.*")],
+            title="Queue Preset"
+        )
+        
+        if not file_path:
+            return
+            
+        try:
+            with open(file_path, 'r') as f:
+                settings = json.load(f)
+            
+            # The player warms the preset up in the background
+            self.player.enqueue(settings)
+            self.update_queue_label()
+        except Exception as e:
+            messagebox.showerror("Queue Failed", f"Error: {str(e)}")
+    
+    def next_preset(self):
+        if not self.player.queue:
+            messagebox.showinfo("Empty Queue", "Please queue a preset first.")
+            return
+        
+        if self.is_playing:
+            # Crossfade inside the running stream
+            self.player.request_switch()
+        else:
+            self.player.switch_now()
+            self.poll_player(reschedule=False)
+    
+    def clear_queue(self):
+        self.player.clear_queue()
+        self.update_queue_label()
+    
+    def open_meters(self):
+        """Show level meters and a spectrum of the current output"""
+        if self.meter_window is not None:
+            self.meter_window.lift()
+            return
+        
+        self.meter_taps = MeterTaps(self.sample_rate)
+        self.engine.meter = self.meter_taps
+        self.meter_processor = MeterProcessor(self.meter_taps)
+        self.meter_processor.start()
+        
+        window = tk.Toplevel(self.root)
+        window.title("Meters")
+        window.geometry("560x520")
+        window.protocol("WM_DELETE_WINDOW", self.close_meters)
+        self.meter_window = window
+        
+        source_frame = ttk.Frame(window)
+        source_frame.pack(fill="x", padx=5, pady=5)
+        ttk.Label(source_frame, text="Spectrum of:").pack(side="left", padx=5)
+        self.meter_source_var = tk.StringVar(value="Master")
+        self.meter_source_box = ttk.Combobox(source_frame, textvariable=self.meter_source_var,
+                                             state="readonly", width=40)
+        self.meter_source_box.pack(side="left", padx=5)
+        
+        self.meter_readout = ttk.Label(window, text="L: -  R: -  Beat: -")
+        self.meter_readout.pack(fill="x", padx=10)
+        
+        self.spectrum_canvas = tk.Canvas(window, height=200, bg="black")
+        self.spectrum_canvas.pack(fill="x", padx=5, pady=5)
+        self.level_canvas = tk.Canvas(window, bg="#f0f0f0")
+        self.level_canvas.pack(fill="both", expand=True, padx=5, pady=5)
+        
+        self.refresh_meters()
+    
+    def close_meters(self):
+        if self.meter_window is None:
+            return
+        self.meter_processor.stop()
+        self.meter_processor = None
+        self.engine.meter = None
+        self.meter_taps = None
+        self.meter_window.destroy()
+        self.meter_window = None
+    
+    def refresh_meters(self):
+        """Draw the latest meter results; never analyzes audio itself"""
+        if self.meter_window is None:
+            return
+        
+        # Keep the source list in step with the tracks being edited
+        labels = {"Master": None}
+        for track in self.tracks:
+            labels[self.track_summary(track)] = track["id"]
+        if list(self.meter_source_box["values"]) != list(labels):
+            self.meter_source_box["values"] = list(labels)
+        self.meter_processor.spectrum_source = labels.get(self.meter_source_var.get())
+        
+        results = self.meter_processor.results
+        if results is not None:
+            self.draw_spectrum(results)
+            self.draw_levels(results)
+        
+        self.root.after(int(1000 / METER_RATE), self.refresh_meters)
+    
+    def draw_spectrum(self, results):
+        canvas = self.spectrum_canvas
+        canvas.delete("all")
+        if "spectrum" not in results:
+            return
+        
+        width = canvas.winfo_width()
+        height = canvas.winfo_height()
+        freqs, spectrum = results["spectrum"]
+        log_min = np.log10(SPECTRUM_MIN_FREQ)
+        x = (np.log10(freqs) - log_min) / (np.log10(freqs[-1]) - log_min) * width
+        y = np.clip(spectrum / SPECTRUM_FLOOR_DB, 0, 1) * height
+        canvas.create_line(*np.column_stack((x, y)).ravel().tolist(), fill="#40c040")
+        
+        for freq in (100, 1000, 10000):
+            fx = (np.log10(freq) - log_min) / (np.log10(freqs[-1]) - log_min) * width
+            canvas.create_line(fx, 0, fx, height, fill="#404040")
+            canvas.create_text(fx + 2, height - 2, text=f"{freq:g} Hz", anchor="sw", fill="#808080")
+        
+        left, right = results["channel_freqs"]
+        beat = results.get("beat")
+        self.meter_readout.config(
+            text=f"L: {left:.3f} Hz   R: {right:.3f} Hz   Beat: {beat:.3f} Hz"
+            if beat is not None else "L: -  R: -  Beat: -")
+    
+    def draw_levels(self, results):
+        """Peak line over an RMS bar for each channel, master first"""
+        canvas = self.level_canvas
+        canvas.delete("all")
+        width = canvas.winfo_width()
+        
+        rows = [("Master", results["master"])]
+        for track in self.tracks[:METER_TRACK_LIMIT - 1]:
+            levels = results["tracks"].get(track["id"])
+            if levels is not None and track["enabled"].get():
+                rows.append((f"Track {track['id']+1}", levels))
+        
+        label_width = 70
+        bar_width = max(width - label_width - 10, 10)
+        for row, (label, levels) in enumerate(rows):
+            top = 5 + row * 24
+            canvas.create_text(5, top + 10, text=label, anchor="w")
+            for channel in range(2):
+                y = top + channel * 10
+                rms = np.clip(1 - levels["rms"][channel] / METER_FLOOR_DB, 0, 1)
+                peak = np.clip(1 - levels["peak"][channel] / METER_FLOOR_DB, 0, 1)
+                canvas.create_rectangle(label_width, y, label_width + bar_width, y + 8,
+                                        fill="#d0d0d0", outline="")
+                canvas.create_rectangle(label_width, y, label_width + rms * bar_width, y + 8,
+                                        fill="#40a040", outline="")
+                peak_x = label_width + peak * bar_width
+                canvas.create_line(peak_x, y, peak_x, y + 8,
+                                   fill="red" if levels["peak"][channel] > -1 else "black")
+    
+    def update_queue_label(self):
+        self.queue_label.config(text=f"Queued: {len(self.player.queue)}")
+    
+    def poll_player(self, reschedule=True):
+        """Show the player's engine in the editor once a switch has happened"""
+        self.player.poll()
+        if self.player.engine is not self.engine:
+            self.clear_track_rows()
+            self.show_engine(self.player.engine)
+        self.update_queue_label()
+        
+        if reschedule:
+            self.root.after(200, self.poll_player)
+    
+    def clear_track_rows(self):
+        self.pending_rows = []
+        for track in self.tracks:
+            ui = track.get("ui")
+            if ui is not None and ui["row"] is not None:
+                ui["row"].destroy()
+                ui["row"] = None
+                ui["editor"] = None
+                ui["vars"] = []
+                ui["expanded"] = False
+    
+    def show_engine(self, engine):
+        """Point the editor at an engine and lazily rebuild its track rows"""
+        self.engine.meter = None
+        self.engine = engine
+        self.track_counter = max((track["id"] for track in engine.tracks), default=-1) + 1
+        for track in engine.tracks:
+            track.setdefault("ui", self.new_track_ui())
+        
+        # Per-track taps follow the engine being edited; ids restart per preset
+        if self.meter_taps is not None:
+            self.meter_taps.tracks = {}
+            engine.meter = self.meter_taps
+        
+        self.volume_slider.set(self.volume)
+        self.volume_entry.delete(0, tk.END)
+        self.volume_entry.insert(0, f"{int(self.volume * 100)}%")
+        
+        self.duration_slider.set(min(self.duration, 600))
+        self.duration_var.set(str(self.duration))
+        
+        # Create collapsed rows in batches so the UI stays responsive
+        self.pending_rows = list(engine.tracks)
+        self.create_pending_rows()
+
+    def new_track_ui(self):
+        """Widget bookkeeping for a track; nothing is built until needed"""
+        return {
+            "row": None,
+            "header": None,
+            "toggle": None,
+            "body": None,
+            "editor": None,
+            "vars": [],
+            "expanded": False,
+            "editor_height": 0
+        }
+
     def add_track(self, track_type, settings=None):
-        # Create a new track frame
-        track_id = self.track_counter
-        frame = ttk.LabelFrame(self.tracks_frame, text=f"Track {track_id+1}: {track_type.title()}")
+        track_data = create_track_state(self.track_counter, track_type, settings)
+        track_data["ui"] = self.new_track_ui()
+        self.track_counter += 1
+        
+        with self.audio_lock:
+            self.tracks.append(track_data)
+        self.player.update_tracks()
+        
+        # Newly added tracks open straight into their editor
+        self.create_track_row(track_data)
+        self.toggle_track_editor(track_data["id"])
+    
+    def create_pending_rows(self):
+        """Create the next batch of collapsed track rows"""
+        batch = self.pending_rows[:ROW_BATCH_SIZE]
+        self.pending_rows = self.pending_rows[ROW_BATCH_SIZE:]
+        
+        for track in batch:
+            self.create_track_row(track)
+        
+        if self.pending_rows:
+            self.root.after(1, self.create_pending_rows)
+    
+    def create_track_row(self, track):
+        """Create the lightweight collapsed row for a track"""
+        ui = track["ui"]
+        row = ttk.Frame(self.tracks_frame)
+        row.pack(fill="x", padx=5, pady=2)
+        
+        header_frame = ttk.Frame(row)
+        header_frame.pack(fill="x")
+        
+        toggle = ttk.Button(header_frame, text="▸", width=3,
+                            command=lambda tid=track["id"]: self.toggle_track_editor(tid))
+        toggle.pack(side="left", padx=5)
+        
+        header = ttk.Label(header_frame, text=self.track_summary(track))
+        header.pack(side="left", padx=5)
+        
+        remove_btn = ttk.Button(header_frame, text="Remove",
+                                command=lambda tid=track["id"]: self.remove_track(tid))
+        remove_btn.pack(side="right", padx=5)
+        
+        ui["row"] = row
+        ui["header"] = header
+        ui["toggle"] = toggle
+        ui["body"] = ttk.Frame(row)
+    
+    def track_summary(self, track):
+        summary = f"Track {track['id']+1}: {track['type'].title()} - {track['title'].get()}"
+        if not track["enabled"].get():
+            summary += " (disabled)"
+        return summary
+    
+    def find_track(self, track_id):
+        for track in self.tracks:
+            if track["id"] == track_id:
+                return track
+        return None
+    
+    def toggle_track_editor(self, track_id):
+        track = self.find_track(track_id)
+        if track is None or track["ui"]["row"] is None:
+            return
+        
+        ui = track["ui"]
+        if ui["expanded"]:
+            self.destroy_track_editor(track)
+            ui["body"].pack_forget()
+            ui["toggle"].config(text="▸")
+            ui["expanded"] = False
+        else:
+            ui["body"].pack(fill="x")
+            ui["toggle"].config(text="▾")
+            ui["expanded"] = True
+            self.build_track_editor(track)
+    
+    def schedule_visible_refresh(self):
+        if not self.visible_refresh_pending:
+            self.visible_refresh_pending = True
+            self.root.after_idle(self.refresh_visible_editors)
+    
+    def refresh_visible_editors(self):
+        """Build editors for expanded tracks near the viewport and drop the rest"""
+        self.visible_refresh_pending = False
+        
+        view_top = self.tracks_canvas.canvasy(0)
+        view_height = self.tracks_canvas.winfo_height()
+        # Keep one screen of editors built above and below to avoid flicker
+        low = view_top - view_height
+        high = view_top + 2 * view_height
+        
+        for track in self.tracks:
+            ui = track["ui"]
+            if ui["row"] is None or not ui["expanded"]:
+                continue
+            
+            row_top = ui["row"].winfo_y()
+            row_bottom = row_top + ui["row"].winfo_height()
+            visible = row_bottom >= low and row_top <= high
+            
+            if visible and ui["editor"] is None:
+                self.build_track_editor(track)
+            elif not visible and ui["editor"] is not None:
+                self.destroy_track_editor(track)
+    
+    def bind_track_var(self, track, key, var_class):
+        """Create a Tk variable that writes through to the track's engine state"""
+        value = track[key]
+        var = var_class(value=value.get())
+        
+        def sync(*args):
+            try:
+                value.set(var.get())
+            except tk.TclError:
+                return
+            if key in ("title", "enabled"):
+                track["ui"]["header"].config(text=self.track_summary(track))
+            self.player.update_parameter(track["id"], key, value.get())
+        
+        var.trace_add("write", sync)
+        # Keep a reference, Tk variables are unset when garbage collected
+        track["ui"]["vars"].append(var)
+        return var
+    
+    def build_track_editor(self, track):
+        ui = track["ui"]
+        if ui["editor"] is not None:
+            return
+        
+        track_type = track["type"]
+        body = ui["body"]
+        body.pack_propagate(True)
+        
+        frame = ttk.LabelFrame(body, text=f"Track {track['id']+1}: {track_type.title()}")
         frame.pack(fill="x", padx=5, pady=5)
+        ui["editor"] = frame
         
         # Common controls
         controls_frame = ttk.Frame(frame)
         controls_frame.pack(fill="x", padx=5, pady=5)
         
         # Track title
-        title = settings["title"] if settings else f"{track_type.title()} {track_id+1}"
-        title_var = tk.StringVar(value=title)
+        title_var = self.bind_track_var(track, "title", tk.StringVar)
         title_entry = ttk.Entry(controls_frame, textvariable=title_var, width=20)
         title_entry.pack(side="left", padx=5)
         
-        # Remove button
-        remove_btn = ttk.Button(controls_frame, text="Remove", 
-                               command=lambda tid=track_id: self.remove_track(tid))
-        remove_btn.pack(side="right", padx=5)
-        
-        # Track-specific controls
-        track_data = {
-            "id": track_id,
-            "type": track_type,
-            "frame": frame,
-            "title": title_var,
-            "enabled": tk.BooleanVar(value=settings["enabled"] if settings else True),
-            "volume": tk.DoubleVar(value=settings["volume"] if settings else 1.0)
-        }
-        
         # Add Enable checkbox
         enable_check = ttk.Checkbutton(controls_frame, text="Enable", 
-                                      variable=track_data["enabled"])
+                                      variable=self.bind_track_var(track, "enabled", tk.BooleanVar))
         enable_check.pack(side="right", padx=5)
         
         # Add volume control
@@ -669,72 +926,84 @@ class BinauralApp:
         volume_frame.pack(fill="x", padx=5, pady=2)
         ttk.Label(volume_frame, text="Volume:").pack(side="left", padx=5)
         volume_slider = ttk.Scale(volume_frame, from_=0, to=1, 
-                                 variable=track_data["volume"],
+                                 variable=self.bind_track_var(track, "volume", tk.DoubleVar),
                                  orient="horizontal")
         volume_slider.pack(side="left", fill="x", expand=True, padx=5)
         
         # Specific controls based on track type
         if track_type == "binaural":
-            self.setup_binaural_controls(frame, track_data, settings)
+            self.setup_binaural_controls(frame, track)
         elif track_type == "noise":
-            self.setup_noise_controls(frame, track_data, settings)
+            self.setup_noise_controls(frame, track)
         elif track_type == "tone":
-            self.setup_tone_controls(frame, track_data, settings)
+            self.setup_tone_controls(frame, track)
         
         # Add pan controls for all track types
-        self.setup_pan_controls(frame, track_data, settings)
+        self.setup_pan_controls(frame, track)
+    
+    def destroy_track_editor(self, track):
+        """Tear down a track's editor, keeping its height as a placeholder"""
+        ui = track["ui"]
+        if ui["editor"] is None:
+            return
         
-        # Add to tracks list
-        self.tracks.append(track_data)
-        self.track_counter += 1
+        ui["editor_height"] = ui["body"].winfo_height()
+        ui["editor"].destroy()
+        ui["editor"] = None
+        ui["vars"] = []
+        
+        # Hold the space so rows below don't jump while scrolling
+        ui["body"].configure(height=ui["editor_height"])
+        ui["body"].pack_propagate(False)
         
     def remove_track(self, track_id):
-        for i, track in enumerate(self.tracks):
-            if track["id"] == track_id:
-                track["frame"].destroy()
-                self.tracks.pop(i)
-                break
+        track = self.find_track(track_id)
+        if track is None:
+            return
+        
+        if track["ui"]["row"] is not None:
+            track["ui"]["row"].destroy()
+        elif track in self.pending_rows:
+            self.pending_rows.remove(track)
+        
+        with self.audio_lock:
+            self.tracks.remove(track)
+        self.player.update_tracks()
                 
-    def setup_binaural_controls(self, frame, track_data, settings=None):
+    def setup_binaural_controls(self, frame, track_data):
         controls = ttk.Frame(frame)
         controls.pack(fill="x", padx=5, pady=2)
         
         # Base frequency control
-        base_freq = tk.DoubleVar(value=settings["base_freq"] if settings else 200.0)
-        track_data["base_freq"] = base_freq
+        base_freq = self.bind_track_var(track_data, "base_freq", tk.DoubleVar)
         self.create_slider_with_entry(controls, "Base Frequency:", 20, 1000, base_freq, unit=" Hz")
         
         # Beat frequency control
-        beat_freq = tk.DoubleVar(value=settings["beat_freq"] if settings else 7.83)
-        track_data["beat_freq"] = beat_freq
+        beat_freq = self.bind_track_var(track_data, "beat_freq", tk.DoubleVar)
         self.create_slider_with_entry(controls, "Beat Frequency:", 0.5, 40.0, beat_freq, unit=" Hz")
         
-    def setup_noise_controls(self, frame, track_data, settings=None):
+    def setup_noise_controls(self, frame, track_data):
         controls = ttk.Frame(frame)
         controls.pack(fill="x", padx=5, pady=2)
         
         # Noise type selection
         ttk.Label(controls, text="Noise Type:").pack(side="left", padx=5)
-        noise_type = tk.StringVar(value=settings["noise_type"] if settings else "white")
-        track_data["noise_type"] = noise_type
+        noise_type = self.bind_track_var(track_data, "noise_type", tk.StringVar)
         noise_combo = ttk.Combobox(controls, textvariable=noise_type, 
                                   values=["white", "pink", "brown"],
                                   state="readonly", width=10)
         noise_combo.pack(side="left", padx=5)
         
         # Frequency controls
-        low_cut = tk.DoubleVar(value=settings["low_cut"] if settings else 20.0)
-        track_data["low_cut"] = low_cut
+        low_cut = self.bind_track_var(track_data, "low_cut", tk.DoubleVar)
         self.create_slider_with_entry(frame, "Low Cut:", 20, 20000, low_cut, unit=" Hz")
         
-        high_cut = tk.DoubleVar(value=settings["high_cut"] if settings else 20000.0)
-        track_data["high_cut"] = high_cut
+        high_cut = self.bind_track_var(track_data, "high_cut", tk.DoubleVar)
         self.create_slider_with_entry(frame, "High Cut:", 20, 20000, high_cut, unit=" Hz")
         
-    def setup_tone_controls(self, frame, track_data, settings=None):
+    def setup_tone_controls(self, frame, track_data):
         # Basic frequency control
-        frequency = tk.DoubleVar(value=settings["frequency"] if settings else 432.0)
-        track_data["frequency"] = frequency
+        frequency = self.bind_track_var(track_data, "frequency", tk.DoubleVar)
         self.create_slider_with_entry(frame, "Frequency:", 20, 20000, frequency, unit=" Hz")
         
         # Isochronic controls
@@ -742,18 +1011,15 @@ class BinauralApp:
         iso_frame.pack(fill="x", padx=5, pady=2)
         
         # Enable isochronic checkbox
-        iso_enabled = tk.BooleanVar(value=settings["iso_enabled"] if settings else False)
-        track_data["iso_enabled"] = iso_enabled
+        iso_enabled = self.bind_track_var(track_data, "iso_enabled", tk.BooleanVar)
         ttk.Checkbutton(iso_frame, text="Enable Isochronic Pulses", 
                        variable=iso_enabled).pack(side="left", padx=5)
         
         # Isochronic parameters
-        iso_freq = tk.DoubleVar(value=settings["iso_freq"] if settings else 7.83)
-        track_data["iso_freq"] = iso_freq
+        iso_freq = self.bind_track_var(track_data, "iso_freq", tk.DoubleVar)
         self.create_slider_with_entry(frame, "Pulse Rate:", 0.5, 40.0, iso_freq, unit=" Hz")
         
-        iso_depth = tk.DoubleVar(value=settings["iso_depth"] if settings else 1.0)
-        track_data["iso_depth"] = iso_depth
+        iso_depth = self.bind_track_var(track_data, "iso_depth", tk.DoubleVar)
         self.create_slider_with_entry(frame, "Pulse Depth:", 0.0, 1.0, iso_depth)
         
         # Frequency modulation controls
@@ -761,32 +1027,27 @@ class BinauralApp:
         mod_frame.pack(fill="x", padx=5, pady=2)
         
         # Enable modulation checkbox
-        mod_enabled = tk.BooleanVar(value=settings["mod_enabled"] if settings else False)
-        track_data["mod_enabled"] = mod_enabled
+        mod_enabled = self.bind_track_var(track_data, "mod_enabled", tk.BooleanVar)
         ttk.Checkbutton(mod_frame, text="Enable Frequency Modulation", 
                        variable=mod_enabled).pack(side="left", padx=5)
         
         # Modulation parameters
-        min_freq = tk.DoubleVar(value=settings["min_freq"] if settings else 20.0)
-        track_data["min_freq"] = min_freq
+        min_freq = self.bind_track_var(track_data, "min_freq", tk.DoubleVar)
         self.create_slider_with_entry(frame, "Min Freq:", 20, 20000, min_freq, unit=" Hz")
         
-        max_freq = tk.DoubleVar(value=settings["max_freq"] if settings else 1000.0)
-        track_data["max_freq"] = max_freq
+        max_freq = self.bind_track_var(track_data, "max_freq", tk.DoubleVar)
         self.create_slider_with_entry(frame, "Max Freq:", 20, 20000, max_freq, unit=" Hz")
         
-        mod_speed = tk.DoubleVar(value=settings["mod_speed"] if settings else 0.5)
-        track_data["mod_speed"] = mod_speed
+        mod_speed = self.bind_track_var(track_data, "mod_speed", tk.DoubleVar)
         self.create_slider_with_entry(frame, "Mod Speed:", 0.1, 10.0, mod_speed, unit=" Hz")
         
-    def setup_pan_controls(self, frame, track_data, settings=None):
+    def setup_pan_controls(self, frame, track_data):
         pan_frame = ttk.Frame(frame)
         pan_frame.pack(fill="x", padx=5, pady=2)
         
         # Pan mode selection
         ttk.Label(pan_frame, text="Pan Mode:").pack(side="left", padx=5)
-        pan = tk.StringVar(value=settings["pan"] if settings else "Center")
-        track_data["pan"] = pan
+        pan = self.bind_track_var(track_data, "pan", tk.StringVar)
         mode_combo = ttk.Combobox(pan_frame, textvariable=pan,
                                  values=["Left", "Right", "Center", "L-R", "R-L"],
                                  state="readonly", width=12)
@@ -798,20 +1059,17 @@ class BinauralApp:
         
         # Pan direction
         ttk.Label(auto_pan_frame, text="Direction:").pack(side="left", padx=5)
-        pan_direction = tk.StringVar(value=settings["pan_direction"] if settings else "alternate")
-        track_data["pan_direction"] = pan_direction
+        pan_direction = self.bind_track_var(track_data, "pan_direction", tk.StringVar)
         direction_combo = ttk.Combobox(auto_pan_frame, textvariable=pan_direction,
                                      values=["left-to-right", "right-to-left", "alternate"],
                                      state="readonly", width=12)
         direction_combo.pack(side="left", padx=5)
         
         # Pan speed and depth
-        pan_speed = tk.DoubleVar(value=settings["pan_speed"] if settings else 0.5)
-        track_data["pan_speed"] = pan_speed
+        pan_speed = self.bind_track_var(track_data, "pan_speed", tk.DoubleVar)
         self.create_slider_with_entry(frame, "Speed:", 0.1, 2.0, pan_speed, unit=" Hz")
         
-        pan_depth = tk.DoubleVar(value=settings["pan_depth"] if settings else 0.5)
-        track_data["pan_depth"] = pan_depth
+        pan_depth = self.bind_track_var(track_data, "pan_depth", tk.DoubleVar)
         self.create_slider_with_entry(frame, "Depth:", 0.0, 1.0, pan_depth)
         
         # Function to toggle auto-pan controls visibility
@@ -826,16 +1084,6 @@ class BinauralApp:
         # Initial state
         update_pan_controls()
 
-    def apply_anti_aliasing(self, data):
-        """Apply a simple anti-aliasing filter"""
-        # Simple 2-pole lowpass filter
-        alpha = 0.1  # Filter coefficient
-        filtered = np.zeros_like(data)
-        filtered[0] = data[0]
-        for i in range(1, len(data)):
-            filtered[i] = alpha * data[i] + (1 - alpha) * filtered[i-1]
-        return filtered
-
 def main():
     root = tk.Tk()
     app = BinauralApp(root)
@@ -0,0 +1,173 @@
+import numpy as np
+from scipy.ndimage import maximum_filter1d
+from scipy.signal import lfilter
+
+# Master limiter defaults
+LIMITER_CEILING_DB = -1.0
+LIMITER_LOOKAHEAD_MS = 5.0
+LIMITER_RELEASE_MS = 80.0
+
+# Master bus processing modes
+MASTER_MODES = ["limiter", "softclip", "off"]
+
+
+class LookaheadLimiter:
+    """Block-vectorized lookahead peak limiter.
+
+    The signal is delayed by the lookahead. For every sample the target gain
+    is the ceiling over the largest peak in the next `lookahead` samples
+    (a sliding-window max). A moving average over the lookahead turns that
+    into an attack ramp that is complete by the time the peak comes out of
+    the delay, and a one-pole filter only lets the gain recover slowly. All
+    three stages carry their state across blocks.
+    """
+
+    def __init__(self, sample_rate=44100, channels=2, ceiling_db=LIMITER_CEILING_DB,
+                 lookahead_ms=LIMITER_LOOKAHEAD_MS, release_ms=LIMITER_RELEASE_MS):
+        self.channels = channels
+        self.ceiling = 10 ** (ceiling_db / 20)
+        self.lookahead = max(1, int(sample_rate * lookahead_ms / 1000))
+        self.release_coeff = np.exp(-1.0 / (sample_rate * release_ms / 1000))
+        self.reset()
+
+    def reset(self, history=None):
+        """Forget the gain envelope and refill the lookahead delay.
+
+        `history` holds the last `lookahead` input frames, so a limiter
+        switched in mid-stream continues the signal instead of starting
+        from silence.
+        """
+        self.delay = np.zeros((self.lookahead, self.channels)) if history is None else history
+        self.gain_history = np.ones(self.lookahead - 1)
+        self.release_state = np.array([self.release_coeff])
+
+    @property
+    def latency(self):
+        return self.lookahead
+
+    def process(self, block):
+        """Limit a (frames, channels) block; output is delayed by `latency`"""
+        frames = len(block)
+        if frames == 0:
+            return np.zeros((0, self.channels))
+
+        buffer = np.concatenate((self.delay, block))
+        # Per-sample peak across channels (column-wise is faster than axis=1)
+        peaks = np.abs(buffer[:, 0])
+        for channel in range(1, self.channels):
+            np.maximum(peaks, np.abs(buffer[:, channel]), out=peaks)
+
+        # Largest peak from each output sample through the lookahead window;
+        # the centred running max is shifted so window i covers i..i+lookahead
+        size = self.lookahead + 1
+        window_peaks = maximum_filter1d(peaks, size)[size // 2:size // 2 + frames]
+        target = np.minimum(1.0, self.ceiling / np.maximum(window_peaks, 1e-12))
+
+        # Attack: average over the lookahead so the ramp ends on the peak
+        gains = np.concatenate((self.gain_history, target))
+        sums = np.cumsum(np.concatenate(([0.0], gains)))
+        attack = (sums[self.lookahead:] - sums[:-self.lookahead]) / self.lookahead
+        self.gain_history = gains[len(gains) - (self.lookahead - 1):]
+
+        # Release: slow recovery, never above the attack envelope
+        released, self.release_state = lfilter([1 - self.release_coeff], [1, -self.release_coeff],
+                                               attack, zi=self.release_state)
+        gain = np.minimum(attack, released)
+
+        output = buffer[:frames] * gain[:, None]
+        self.delay = buffer[frames:]
+        return output
+
+    def flush(self):
+        """Return the audio still held in the lookahead delay"""
+        return self.process(np.zeros((self.lookahead, self.channels)))
+
+
+class SoftClipLUT:
+    """Table-based soft clipper that leaves the signal untouched below a knee.
+
+    Above the knee the level is bent with a tanh curve toward 1.0. The
+    curve is sampled once into a table and interpolated linearly. Only the
+    samples above the knee are looked up and replaced, so blocks that stay
+    below it are returned as they are. When most of a block is over the
+    knee, gathering from the table costs more than evaluating the curve, so
+    such blocks use the curve directly.
+    """
+
+    def __init__(self, knee=0.5, input_range=4.0, size=16384):
+        self.knee = knee
+        self.width = 1.0 - knee
+        self.grid = np.linspace(0.0, input_range, size)
+        self.table = np.where(self.grid <= knee, self.grid, self.bend(self.grid))
+
+    def bend(self, magnitude):
+        return self.knee + self.width * np.tanh((magnitude - self.knee) / self.width)
+
+    def __call__(self, data, in_place=False):
+        """Clip a block; `in_place` reuses a contiguous block the caller owns"""
+        magnitude = np.abs(data).reshape(-1)
+        over = np.flatnonzero(magnitude > self.knee)
+        if not over.size:
+            return data
+        if over.size > magnitude.size // 4:
+            magnitude = magnitude.reshape(data.shape)
+            return np.where(magnitude > self.knee, np.copysign(self.bend(magnitude), data), data)
+
+        output = data if in_place and data.flags.c_contiguous else data.copy()
+        flat = output.reshape(-1)
+        # np.interp holds the last table value beyond the input range
+        flat[over] = np.copysign(np.interp(magnitude[over], self.grid, self.table), flat[over])
+        return output
+
+
+class MasterBus:
+    """Final processing of the mix: lookahead limiter, soft clip or nothing.
+
+    Changing the mode mid-stream crossfades from the old processing to the
+    new one over the next block, since the limiter's lookahead delay means
+    the two are not sample-aligned.
+    """
+
+    def __init__(self, sample_rate=44100, channels=2, mode="limiter"):
+        self.mode = mode
+        self.previous_mode = None
+        self.limiter = LookaheadLimiter(sample_rate, channels)
+        self.clipper = SoftClipLUT()
+        # Latest input frames while the limiter is idle, to prime it when switched in
+        self.recent = np.zeros((self.limiter.lookahead, channels))
+
+    @property
+    def latency(self):
+        return self.limiter.latency if self.mode == "limiter" else 0
+
+    def set_mode(self, mode):
+        if mode == self.mode:
+            return
+        self.previous_mode = self.mode
+        self.mode = mode
+        if mode == "limiter":
+            # Don't replay whatever was left in the delay when it was last used
+            self.limiter.reset(self.recent)
+
+    def process_mode(self, mode, block):
+        if mode == "limiter":
+            return self.limiter.process(block)
+        if mode == "softclip":
+            return self.clipper(block)
+        return block
+
+    def process(self, block):
+        if self.mode != "limiter":
+            self.recent = np.concatenate((self.recent, block))[-self.limiter.lookahead:]
+        output = self.process_mode(self.mode, block)
+        if self.previous_mode is not None:
+            outgoing = self.process_mode(self.previous_mode, block)
+            ramp = np.linspace(0.0, 1.0, len(block))[:, None]
+            output = outgoing * (1 - ramp) + output * ramp
+            self.previous_mode = None
+        return output
+
+    def flush(self):
+        if self.mode == "limiter":
+            return self.limiter.flush()
+        return np.zeros((0, self.limiter.channels))
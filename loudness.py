@@ -0,0 +1,158 @@
+import numpy as np
+from scipy.signal import firwin, lfilter
+
+# ITU-R BS.1770 gating parameters
+BLOCK_SECONDS = 0.4
+HOP_SECONDS = 0.1
+ABSOLUTE_GATE_LUFS = -70.0
+RELATIVE_GATE_LU = -10.0
+
+# True-peak measurement oversampling (BS.1770 annex 2)
+TRUE_PEAK_OVERSAMPLE = 4
+TRUE_PEAK_TAPS_PER_PHASE = 12
+
+
+def k_weighting_filters(sample_rate):
+    """Return the (b, a) pairs of the two K-weighting stages for a sample rate"""
+    # Stage 1: high shelf modelling the acoustic effect of the head
+    gain_db = 3.99984385397
+    q = 0.7071752369554193
+    k = np.tan(np.pi * 1681.974450955533 / sample_rate)
+    vh = 10 ** (gain_db / 20)
+    vb = vh ** 0.499666774155
+    a0 = 1 + k / q + k * k
+    shelf_b = np.array([(vh + vb * k / q + k * k) / a0,
+                        2 * (k * k - vh) / a0,
+                        (vh - vb * k / q + k * k) / a0])
+    shelf_a = np.array([1.0, 2 * (k * k - 1) / a0, (1 - k / q + k * k) / a0])
+
+    # Stage 2: RLB high pass
+    q = 0.5003270373253953
+    k = np.tan(np.pi * 38.13547087613982 / sample_rate)
+    a0 = 1 + k / q + k * k
+    highpass_b = np.array([1.0, -2.0, 1.0])
+    highpass_a = np.array([1.0, 2 * (k * k - 1) / a0, (1 - k / q + k * k) / a0])
+
+    return [(shelf_b, shelf_a), (highpass_b, highpass_a)]
+
+
+def power_to_lufs(power):
+    return -0.691 + 10 * np.log10(power) if power > 0 else float("-inf")
+
+
+def lufs_to_power(lufs):
+    return 10 ** ((lufs + 0.691) / 10)
+
+
+class LoudnessMeter:
+    """Streaming K-weighted integrated loudness and true-peak meter.
+
+    Audio is fed chunk by chunk with `process`; only filter state, the
+    partial 100 ms hop and one mean-square value per 100 ms are kept, so
+    memory stays small however long the render is.
+    """
+
+    def __init__(self, sample_rate=44100, channels=2):
+        self.sample_rate = sample_rate
+        self.channels = channels
+
+        self.filters = k_weighting_filters(sample_rate)
+        self.filter_states = [np.zeros((len(a) - 1, channels)) for b, a in self.filters]
+
+        self.hop_size = int(round(HOP_SECONDS * sample_rate))
+        self.hops_per_block = int(round(BLOCK_SECONDS / HOP_SECONDS))
+        self.hop_energy = 0.0
+        self.hop_fill = 0
+        self.hop_powers = []
+
+        # Polyphase interpolator for true-peak estimation
+        factor = TRUE_PEAK_OVERSAMPLE
+        self.peak_filter = firwin(factor * TRUE_PEAK_TAPS_PER_PHASE, 1 / factor) * factor
+        self.peak_state = np.zeros((len(self.peak_filter) - 1, channels))
+        self.true_peak = 0.0
+        self.sample_peak = 0.0
+
+    def process(self, chunk):
+        """Feed a (frames, channels) chunk of audio into the meter"""
+        chunk = np.asarray(chunk, dtype=np.float64)
+        if len(chunk) == 0:
+            return
+
+        self.sample_peak = max(self.sample_peak, float(np.max(np.abs(chunk))))
+        self.update_true_peak(chunk)
+
+        weighted = chunk
+        for i, (b, a) in enumerate(self.filters):
+            weighted, self.filter_states[i] = lfilter(b, a, weighted, axis=0,
+                                                      zi=self.filter_states[i])
+        self.accumulate(np.sum(weighted * weighted, axis=1))
+
+    def update_true_peak(self, chunk):
+        factor = TRUE_PEAK_OVERSAMPLE
+        upsampled = np.zeros((len(chunk) * factor, self.channels))
+        upsampled[::factor] = chunk
+        interpolated, self.peak_state = lfilter(self.peak_filter, 1.0, upsampled, axis=0,
+                                                zi=self.peak_state)
+        self.true_peak = max(self.true_peak, self.sample_peak,
+                             float(np.max(np.abs(interpolated))))
+
+    def accumulate(self, energy):
+        """Split per-sample channel-summed energy into 100 ms hops"""
+        position = 0
+        if self.hop_fill:
+            take = min(self.hop_size - self.hop_fill, len(energy))
+            self.hop_energy += energy[:take].sum()
+            self.hop_fill += take
+            position = take
+            if self.hop_fill == self.hop_size:
+                self.hop_powers.append(self.hop_energy / self.hop_size)
+                self.hop_energy = 0.0
+                self.hop_fill = 0
+
+        full_hops = (len(energy) - position) // self.hop_size
+        if full_hops:
+            end = position + full_hops * self.hop_size
+            hops = energy[position:end].reshape(full_hops, self.hop_size)
+            self.hop_powers.extend(hops.mean(axis=1).tolist())
+            position = end
+
+        if position < len(energy):
+            self.hop_energy += energy[position:].sum()
+            self.hop_fill += len(energy) - position
+
+    def block_powers(self):
+        """Mean-square power of each 400 ms block, overlapping by 75%"""
+        hops = np.array(self.hop_powers)
+        if len(hops) < self.hops_per_block:
+            return np.zeros(0)
+        window = np.ones(self.hops_per_block) / self.hops_per_block
+        return np.convolve(hops, window, mode='valid')
+
+    def integrated_loudness(self):
+        """Gated integrated loudness in LUFS"""
+        powers = self.block_powers()
+        powers = powers[powers > lufs_to_power(ABSOLUTE_GATE_LUFS)]
+        if len(powers) == 0:
+            return float("-inf")
+
+        relative_gate = power_to_lufs(powers.mean()) + RELATIVE_GATE_LU
+        powers = powers[powers > lufs_to_power(relative_gate)]
+        return power_to_lufs(powers.mean())
+
+    def true_peak_db(self):
+        return 20 * np.log10(self.true_peak) if self.true_peak > 0 else float("-inf")
+
+    def gain_for_target(self, target_lufs, true_peak_ceiling_db=-1.0):
+        """Linear gain that brings the audio to a target loudness.
+
+        The gain is reduced if needed so the true peak stays below the ceiling.
+        """
+        loudness = self.integrated_loudness()
+        if not np.isfinite(loudness):
+            return 1.0
+
+        gain_db = target_lufs - loudness
+        peak_db = self.true_peak_db()
+        if np.isfinite(peak_db):
+            gain_db = min(gain_db, true_peak_ceiling_db - peak_db)
+        return 10 ** (gain_db / 20)
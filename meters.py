@@ -0,0 +1,177 @@
+import threading
+import time
+import numpy as np
+
+# Seconds of audio kept per tap; taps run at the full sample rate so the
+# spectrum covers the whole band without aliasing
+TAP_SECONDS = 4
+
+# Meter update rate and analysis windows
+METER_RATE = 15
+LEVEL_SECONDS = 0.3
+SPECTRUM_SIZE = 65536
+SPECTRUM_POINTS = 200
+SPECTRUM_MIN_FREQ = 20.0
+
+
+class TapRing:
+    """Ring of recent audio written by the audio thread, read by the meter thread.
+
+    There is one writer and one reader and no lock. The writer copies the
+    block first and only then advances `write_count`, so the reader never
+    sees frames that have not been written. A reader that falls a whole
+    ring behind just gets newer audio than it asked for.
+    """
+
+    def __init__(self, capacity, channels=2):
+        self.capacity = capacity
+        self.data = np.zeros((capacity, channels), dtype=np.float32)
+        self.write_count = 0
+
+    def push(self, block):
+        frames = min(len(block), self.capacity)
+        block = block[len(block) - frames:]
+        start = self.write_count % self.capacity
+        first = min(frames, self.capacity - start)
+        self.data[start:start + first] = block[:first]
+        self.data[:frames - first] = block[first:]
+        self.write_count += frames
+
+    def latest(self, frames):
+        """Copy of the newest frames, oldest first"""
+        count = self.write_count
+        frames = min(frames, count, self.capacity)
+        indices = (count - frames + np.arange(frames)) % self.capacity
+        return self.data[indices]
+
+
+class MeterTaps:
+    """Tap points for the master bus and each track.
+
+    Pushing is a plain copy into a ring, the cheapest thing the audio
+    thread can do; all filtering and analysis is left to the meter thread.
+    """
+
+    def __init__(self, sample_rate=44100, channels=2, seconds=TAP_SECONDS):
+        self.channels = channels
+        self.rate = sample_rate
+        self.capacity = int(self.rate * seconds)
+        self.master = TapRing(self.capacity, channels)
+        self.tracks = {}
+
+    def push_master(self, block):
+        self.master.push(block)
+
+    def push_track(self, track_id, block):
+        ring = self.tracks.get(track_id)
+        if ring is None:
+            ring = self.tracks[track_id] = TapRing(self.capacity, self.channels)
+        ring.push(block)
+
+
+def to_db(value):
+    return 20 * np.log10(np.maximum(value, 1e-10))
+
+
+def measure_levels(frames):
+    """Peak and RMS per channel in dBFS"""
+    if len(frames) == 0:
+        return {"peak": to_db(np.zeros(2)), "rms": to_db(np.zeros(2))}
+    return {
+        "peak": to_db(np.max(np.abs(frames), axis=0)),
+        "rms": to_db(np.sqrt(np.mean(frames.astype(np.float64) ** 2, axis=0)))
+    }
+
+
+def dominant_frequency(magnitude, rate, size):
+    """Strongest frequency with sub-bin accuracy.
+
+    Uses the neighbour-ratio interpolation that is exact for a pure tone
+    under a Hann window, so the beat between the channels is read to a
+    small fraction of the 0.67 Hz bin spacing.
+    """
+    first = int(SPECTRUM_MIN_FREQ * size / rate)
+    peak = first + int(np.argmax(magnitude[first:-1]))
+    if magnitude[peak] <= 0:
+        return None
+    if magnitude[peak + 1] > magnitude[peak - 1]:
+        ratio = magnitude[peak + 1] / magnitude[peak]
+        offset = (2 * ratio - 1) / (ratio + 1)
+    else:
+        ratio = magnitude[peak - 1] / magnitude[peak]
+        offset = -(2 * ratio - 1) / (ratio + 1)
+    return (peak + offset) * rate / size
+
+
+def analyze_spectrum(frames, rate, size=SPECTRUM_SIZE):
+    """Hann-windowed spectrum for display plus the dominant frequency per channel"""
+    padded = np.zeros((size, frames.shape[1]))
+    padded[size - len(frames):] = frames[-size:]
+    window = np.hanning(size)[:, None]
+    magnitude = np.abs(np.fft.rfft(padded * window, axis=0)) / (size / 4)
+
+    channel_freqs = [dominant_frequency(magnitude[:, c], rate, size)
+                     for c in range(magnitude.shape[1])]
+
+    # Log-spaced points for drawing, using the loudest bin near each point
+    bin_freqs = np.fft.rfftfreq(size, 1 / rate)
+    display_freqs = np.geomspace(SPECTRUM_MIN_FREQ, rate / 2, SPECTRUM_POINTS)
+    edges = np.searchsorted(bin_freqs, np.geomspace(SPECTRUM_MIN_FREQ, rate / 2,
+                                                    SPECTRUM_POINTS + 1))
+    edges = np.clip(edges[:-1], 1, len(bin_freqs) - 1)
+    mono = magnitude.max(axis=1)
+    # reduceat gives the max between consecutive edges (or the bin itself when equal)
+    display = np.maximum.reduceat(mono, edges)
+
+    return display_freqs, to_db(display), channel_freqs
+
+
+class MeterProcessor(threading.Thread):
+    """Turns tap audio into levels and a spectrum at a fixed, throttled rate.
+
+    All analysis happens on this thread; the GUI only reads `results`,
+    which is replaced as a whole on every update.
+    """
+
+    def __init__(self, taps, rate=METER_RATE):
+        super().__init__(daemon=True)
+        self.taps = taps
+        self.period = 1.0 / rate
+        self.spectrum_source = None  # None for the master bus, else a track id
+        self.results = None
+        self.running = False
+
+    def stop(self):
+        self.running = False
+
+    def run(self):
+        self.running = True
+        level_frames = int(LEVEL_SECONDS * self.taps.rate)
+        next_update = time.perf_counter()
+
+        while self.running:
+            results = {
+                "master": measure_levels(self.taps.master.latest(level_frames)),
+                "tracks": {track_id: measure_levels(ring.latest(level_frames))
+                           for track_id, ring in list(self.taps.tracks.items())}
+            }
+
+            source = self.taps.master
+            if self.spectrum_source is not None:
+                source = self.taps.tracks.get(self.spectrum_source, source)
+            frames = source.latest(SPECTRUM_SIZE)
+            if len(frames):
+                freqs, spectrum, channel_freqs = analyze_spectrum(frames, self.taps.rate)
+                results["spectrum"] = (freqs, spectrum)
+                results["channel_freqs"] = channel_freqs
+                if None not in channel_freqs:
+                    results["beat"] = abs(channel_freqs[1] - channel_freqs[0])
+            self.results = results
+
+            next_update += self.period
+            delay = next_update - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                # Fell behind; skip ahead instead of trying to catch up
+                next_update = time.perf_counter()
@@ -0,0 +1,347 @@
+import collections
+import multiprocessing
+import time
+from multiprocessing import shared_memory
+import numpy as np
+from audio_engine import SessionEngine, PresetPlayer, create_track_state
+
+# Ring buffer length in blocks; bounds the latency of parameter changes
+RING_BLOCKS = 8
+
+# Longest wait for the render process to fill the ring before playback
+PRIME_TIMEOUT = 2.0
+
+
+class SharedRing:
+    """Single-producer, single-consumer audio ring in shared memory.
+
+    The header holds two monotonically increasing frame counters, the
+    write index and the read index. Each side only ever stores its own
+    index, after the data it covers has been copied. Index loads and
+    stores go through a process-shared lock, which acts as the memory
+    barrier that orders them against the audio copies on any CPU. The lock
+    is held only for the index access, never during a copy. The reader
+    never blocks on it: when it is busy the read returns no frames, which
+    the caller counts as an underrun.
+    """
+
+    HEADER_BYTES = 16
+
+    def __init__(self, capacity, channels=2, name=None, lock=None):
+        self.capacity = capacity
+        self.channels = channels
+        self.lock = multiprocessing.Lock() if lock is None else lock
+        size = self.HEADER_BYTES + capacity * channels * 4
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+            self.owner = True
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            self.owner = False
+
+        self.indices = np.ndarray((2,), dtype=np.int64, buffer=self.shm.buf[:self.HEADER_BYTES])
+        self.data = np.ndarray((capacity, channels), dtype=np.float32,
+                               buffer=self.shm.buf[self.HEADER_BYTES:size])
+        if self.owner:
+            self.indices[:] = 0
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def load_indices(self, block=True):
+        """(write index, read index), or None if the lock was busy"""
+        if not self.lock.acquire(block):
+            return None
+        try:
+            return int(self.indices[0]), int(self.indices[1])
+        finally:
+            self.lock.release()
+
+    def store_index(self, which, value, block=True):
+        """Publish one index after its data; False if the lock was busy"""
+        if not self.lock.acquire(block):
+            return False
+        try:
+            self.indices[which] = value
+        finally:
+            self.lock.release()
+        return True
+
+    def available(self):
+        """Frames written but not yet read"""
+        write_index, read_index = self.load_indices()
+        return write_index - read_index
+
+    def free(self):
+        return self.capacity - self.available()
+
+    def write(self, block):
+        """Copy as much of the block as fits; returns the frames written"""
+        write_index, read_index = self.load_indices()
+        frames = min(len(block), self.capacity - (write_index - read_index))
+        start = write_index % self.capacity
+        first = min(frames, self.capacity - start)
+        self.data[start:start + first] = block[:first]
+        self.data[:frames - first] = block[first:frames]
+        self.store_index(0, write_index + frames)
+        return frames
+
+    def read_into(self, out):
+        """Fill `out` from the ring without blocking; returns the frames read"""
+        indices = self.load_indices(block=False)
+        if indices is None:
+            return 0
+        write_index, read_index = indices
+        frames = min(len(out), write_index - read_index)
+        start = read_index % self.capacity
+        first = min(frames, self.capacity - start)
+        out[:first] = self.data[start:start + first]
+        out[first:frames] = self.data[:frames - first]
+        # If the index can't be published the frames stay in the ring for next time
+        if not self.store_index(1, read_index + frames, block=False):
+            return 0
+        return frames
+
+    def close(self):
+        # Views into the buffer must go before the mapping can be closed
+        del self.indices
+        del self.data
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def session_with_ids(engine):
+    """Engine settings including track ids, so updates can address tracks"""
+    settings = engine.to_settings()
+    for track_data, track in zip(settings["tracks"], engine.tracks):
+        track_data["id"] = track["id"]
+    return settings
+
+
+def replace_tracks(engine, settings):
+    """Swap in a new track list while keeping the play position"""
+    tracks = [create_track_state(track_data.get("id", i), track_data["type"], track_data)
+              for i, track_data in enumerate(settings["tracks"])]
+    with engine.lock:
+        engine.tracks = tracks
+
+
+def apply_message(player, generation, message):
+    """Apply one control message from the GUI process.
+
+    Edits carry the generation of the engine they were made against;
+    those made before the GUI noticed a preset switch are dropped, since
+    track ids restart at 0 in every preset.
+    """
+    command = message[0]
+    if command == "param":
+        message_generation, track_id, key, value = message[1:]
+        if message_generation != generation:
+            return
+        if track_id is None:
+            setattr(player.engine, key, value)
+        else:
+            for track in player.engine.tracks:
+                if track["id"] == track_id and key in track:
+                    track[key].set(value)
+    elif command == "session":
+        if message[1] == generation:
+            replace_tracks(player.engine, message[2])
+    elif command == "enqueue":
+        player.enqueue(message[1])
+    elif command == "switch":
+        player.request_switch()
+    elif command == "clear":
+        player.clear_queue()
+    elif command == "auto_advance":
+        player.auto_advance = message[1]
+    elif command == "master":
+        player.set_master_mode(message[1])
+
+
+def render_worker(ring_name, ring_lock, capacity, settings, sample_rate, block_size, control):
+    """Entry point of the render process: keep the ring topped up"""
+    ring = SharedRing(capacity, name=ring_name, lock=ring_lock)
+    engine = SessionEngine.from_settings(settings, sample_rate)
+    player = PresetPlayer(engine, block_size)
+    player.start(engine)
+    block_period = block_size / sample_rate
+    generation = 0
+    running = True
+
+    try:
+        while running:
+            # Apply parameter updates between blocks
+            while control.poll():
+                message = control.recv()
+                if message[0] == "stop":
+                    running = False
+                    break
+                try:
+                    apply_message(player, generation, message)
+                except Exception as e:
+                    print(f"Render process error: {e}")
+
+            if not running:
+                break
+
+            if ring.free() >= block_size:
+                current = player.engine
+                # Like the in-process callback, a failing block plays as silence
+                try:
+                    block = player.render(block_size)
+                except Exception as e:
+                    print(f"Render process error: {e}")
+                    block = np.zeros((block_size, 2))
+                ring.write(block.astype(np.float32))
+                if player.engine is not current:
+                    generation += 1
+                    control.send(("switched", generation, session_with_ids(player.engine)))
+            else:
+                time.sleep(block_period / 4)
+    except (EOFError, OSError):
+        # The GUI process went away
+        pass
+    finally:
+        ring.close()
+
+
+class RenderProcessPlayer:
+    """PresetPlayer stand-in that synthesizes in a separate process.
+
+    The audio callback only copies finished blocks out of a shared-memory
+    ring, so nothing in the GUI process competes with synthesis for the
+    GIL. Parameter edits and queue commands go over a pipe.
+    """
+
+    def __init__(self, engine, block_size=1024):
+        self.engine = engine
+        self.block_size = block_size
+        self.queue = collections.deque()
+        self._auto_advance = True
+        self.master_mode = "limiter"
+        self.generation = 0  # Counts preset switches made in the render process
+        self.underruns = 0
+        self.exit_reported = False
+        self.ring = None
+        self.process = None
+        self.control = None
+
+    @property
+    def auto_advance(self):
+        return self._auto_advance
+
+    @auto_advance.setter
+    def auto_advance(self, value):
+        self._auto_advance = value
+        self.send("auto_advance", value)
+
+    def send(self, *message):
+        if self.control is None:
+            return
+        try:
+            self.control.send(message)
+        except OSError:
+            # The render process has exited; poll() reports it and stop() cleans up
+            pass
+
+    def start(self, engine):
+        """Start a render process playing the engine from the beginning"""
+        self.stop()
+        self.engine = engine
+        self.generation = 0
+        self.underruns = 0
+        self.exit_reported = False
+
+        capacity = RING_BLOCKS * self.block_size
+        self.ring = SharedRing(capacity)
+        self.control, child_control = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(
+            target=render_worker,
+            args=(self.ring.name, self.ring.lock, capacity, session_with_ids(engine), engine.sample_rate,
+                  self.block_size, child_control),
+            daemon=True)
+        self.process.start()
+
+        self.send("auto_advance", self._auto_advance)
+        self.send("master", self.master_mode)
+        for settings in self.queue:
+            self.send("enqueue", settings)
+
+        # Let the ring fill before the stream starts pulling from it
+        deadline = time.perf_counter() + PRIME_TIMEOUT
+        while self.ring.free() >= self.block_size and time.perf_counter() < deadline:
+            time.sleep(0.005)
+
+    def stop(self):
+        if self.process is None:
+            return
+        self.send("stop")
+        try:
+            self.process.join(timeout=1.0)
+            if self.process.is_alive():
+                self.process.terminate()
+        finally:
+            self.process = None
+            self.control.close()
+            self.control = None
+            self.ring.close()
+            self.ring = None
+
+    def render(self, frames):
+        """Copy the next block out of the ring, padding with silence on underrun"""
+        output = np.zeros((frames, 2), dtype=np.float32)
+        if self.ring is not None and self.ring.read_into(output) < frames:
+            self.underruns += 1
+        return output
+
+    def poll(self):
+        """Pick up preset switches made in the render process"""
+        try:
+            while self.control is not None and self.control.poll():
+                message = self.control.recv()
+                if message[0] == "switched":
+                    if self.queue:
+                        self.queue.popleft()
+                    self.generation = message[1]
+                    self.engine = SessionEngine.from_settings(message[2], self.engine.sample_rate)
+        except (EOFError, OSError):
+            pass
+
+        if self.process is not None and not self.process.is_alive() and not self.exit_reported:
+            self.exit_reported = True
+            print(f"Render process exited unexpectedly (exit code {self.process.exitcode})")
+
+    def update_parameter(self, track_id, key, value):
+        self.send("param", self.generation, track_id, key, value)
+
+    def set_master_mode(self, mode):
+        self.master_mode = mode
+        self.send("master", mode)
+
+    def update_tracks(self):
+        self.send("session", self.generation, session_with_ids(self.engine))
+
+    def queued_settings(self):
+        return list(self.queue)
+
+    def enqueue(self, settings):
+        self.queue.append(settings)
+        self.send("enqueue", settings)
+
+    def clear_queue(self):
+        self.queue.clear()
+        self.send("clear")
+
+    def request_switch(self):
+        if self.queue:
+            self.send("switch")
+
+    def switch_now(self):
+        """Switch to the next queued preset while stopped"""
+        if not self.queue:
+            return None
+        self.engine = SessionEngine.from_settings(self.queue.popleft(), self.engine.sample_rate)
+        return self.engine
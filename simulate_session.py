@@ -0,0 +1,63 @@
+"""Run a session through the real-time render path without a sound card.
+
+Example:
+    python simulate_session.py session.json --seconds 60 --sink null
+"""
+import argparse
+import json
+from audio_engine import SessionEngine, PresetPlayer
+from audio_sinks import create_sink
+
+
+def simulate(settings, seconds=30, sink_kind="null", realtime=True, block_size=1024,
+             sample_rate=44100, file_path=None):
+    """Play a session into a driven sink and return the driver's timing summary"""
+    engine = SessionEngine.from_settings(settings, sample_rate)
+    player = PresetPlayer(engine, block_size)
+    player.start(engine)
+
+    def callback(outdata, frames, time, status):
+        outdata[:] = player.render(frames)
+
+    options = {
+        "sample_rate": sample_rate,
+        "block_size": block_size,
+        "realtime": realtime,
+        "max_blocks": int(seconds * sample_rate / block_size)
+    }
+    if sink_kind == "file":
+        options["file_path"] = file_path
+
+    sink = create_sink(sink_kind, callback, **options)
+    try:
+        sink.run()
+    finally:
+        sink.close()
+    return sink.stats.summary()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate real-time playback of a session")
+    parser.add_argument("settings", help="Session settings exported from the app (JSON)")
+    parser.add_argument("--seconds", type=float, default=30, help="Length of audio to play")
+    parser.add_argument("--sink", choices=["null", "file", "ring"], default="null")
+    parser.add_argument("--output", help="Output file for the file sink")
+    parser.add_argument("--fast", action="store_true",
+                        help="Use a simulated clock instead of real-time pacing")
+    parser.add_argument("--block-size", type=int, default=1024)
+    args = parser.parse_args()
+
+    if args.sink == "file" and not args.output:
+        parser.error("--output is required with the file sink")
+
+    with open(args.settings, 'r') as f:
+        settings = json.load(f)
+
+    summary = simulate(settings, args.seconds, args.sink, not args.fast, args.block_size,
+                       file_path=args.output)
+    for key, value in summary.items():
+        print(f"{key}: {value:.3f}" if isinstance(value, float) else f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()